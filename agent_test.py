@@ -3,10 +3,15 @@ tests to run and debug your minimax and alphabeta agents locally.  The test
 cases used by the project assistant are not public.
 """
 
+import os
+import tempfile
 import unittest
+from multiprocessing import shared_memory
 
 import isolation
 import game_agent
+import opening_book
+import parallel_search
 
 from importlib import reload
 
@@ -38,6 +43,659 @@ class IsolationTest(unittest.TestCase):
         print(self.game.to_string())
         print("Move history:\n{!s}".format(history))
 
+    def test_play_telemetry(self):
+        self.player1 = game_agent.AlphaBetaPlayer()
+        self.player2 = game_agent.AlphaBetaPlayer()
+        self.game = isolation.Board(self.player1, self.player2, 3, 3)
+        log = isolation.MoveLog()
+        winner, history, outcome = self.game.play(observer=log)
+        self.assertEqual([r.move_number for r in log.records],
+                         list(range(1, len(history) + 2)))
+        self.assertEqual(log.records[-1].termination, outcome)
+        self.assertTrue(all(r.termination is None for r in log.records[:-1]))
+        self.assertEqual(log.records[0].legal_move_count, 9)
+        self.assertEqual(len(log.slowest(3)), 3)
+
+    def test_search_clock(self):
+        # Every node costs 0.01ms of a 150ms turn on a simulated timer
+        elapsed = [0.]
+        clock = game_agent.SearchClock(lambda: 150. - elapsed[0], 10.)
+        reads = 0
+        with self.assertRaises(game_agent.SearchTimeout):
+            while True:
+                if clock.countdown <= 1:
+                    reads += 1
+                clock.tick()
+                elapsed[0] += 0.01
+        self.assertGreaterEqual(150. - elapsed[0], 10. - 0.01)
+        self.assertLess(reads, 14000 / 10)
+
+        # A timer that only advances in steps of 5ms must not stretch the
+        # time between two reads beyond MAX_GAP
+        elapsed = [0.]
+        clock = game_agent.SearchClock(lambda: 150. - elapsed[0] // 5. * 5., 10.)
+        gap = longest = 0.
+        with self.assertRaises(game_agent.SearchTimeout):
+            while True:
+                if clock.countdown <= 1:
+                    longest, gap = max(longest, gap), 0.
+                clock.tick()
+                elapsed[0] += 0.01
+                gap += 0.01
+        self.assertLessEqual(longest, clock.MAX_GAP)
+
+        deadline = isolation.Deadline(150)
+        self.assertTrue(0 < deadline() <= 150)
+        self.assertFalse(deadline.expired())
+        self.assertTrue(isolation.Deadline(0).expired())
+
+    def test_time_manager(self):
+        remaining = [150.]
+        time_left = lambda: remaining[0]
+        manager = game_agent.TimeManager(margin=10.)
+        manager.new_turn(time_left)
+        for depth, nodes, elapsed in ((1, 100, 1.), (2, 400, 3.), (3, 1600, 12.)):
+            remaining[0] -= elapsed
+            manager.iteration_done(depth, nodes, (0, 0), 1.)
+        self.assertAlmostEqual(manager.branching_factor(), 12 ** 0.5)
+        self.assertAlmostEqual(manager.predict(), 12. * 12 ** 0.5)
+        self.assertTrue(manager.should_continue())
+        remaining[0] = 40.
+        self.assertFalse(manager.should_continue())
+        remaining[0] = 130.
+        manager.iteration_done(4, 2000, (0, 0), float("inf"))
+        self.assertFalse(manager.should_continue())
+
+        clock = game_agent.SearchClock(time_left, manager.margin)
+        clock.expired = 9.8
+        manager.end_turn(clock)
+        self.assertEqual(manager.margin, 10.)
+        manager = game_agent.TimeManager(margin=10., min_margin=2.)
+        manager.new_turn(time_left)
+        manager.end_turn(clock)
+        self.assertEqual(manager.margin, 2.)
+
+        self.player = game_agent.AlphaBetaPlayer()
+        self.game = isolation.Board(self.player, game_agent.AlphaBetaPlayer(time_manager=None))
+        self.game.apply_move((3, 3))
+        self.game.apply_move((2, 2))
+        self.assertIn(self.player.get_move(self.game, isolation.Deadline(100)),
+                      self.game.get_legal_moves())
+        self.assertTrue(self.player.time_manager.iterations)
+
+        # The calibration never lowers the configured threshold
+        self.player1 = game_agent.AlphaBetaPlayer(timeout=20.)
+        self.player2 = game_agent.AlphaBetaPlayer(timeout=20.)
+        self.game = isolation.Board(self.player1, self.player2)
+        records = []
+        _, _, termination = self.game.play(time_limit=60, observer=records.append)
+        self.assertNotEqual(termination, "timeout")
+        for player in (self.player1, self.player2):
+            self.assertGreaterEqual(player.time_manager.margin, 20.)
+        self.assertGreater(min(record.time_left_ms for record in records), 10.)
+
+    def test_search_stats(self):
+        self.player1 = game_agent.AlphaBetaPlayer()
+        self.player2 = game_agent.MinimaxPlayer()
+        self.game = isolation.Board(self.player1, self.player2)
+        self.game.apply_move((3, 3))
+        self.game.apply_move((2, 2))
+        for player in (self.player1, self.player2):
+            move = player.get_move(self.game, isolation.Deadline(100))
+            stats = player.last_stats
+            self.assertEqual(stats.moves, 1)
+            self.assertGreater(stats.nodes, stats.leaf_evals)
+            self.assertGreater(stats.leaf_evals, 0)
+            self.assertEqual(len(stats.iteration_times), stats.depth if player is self.player1 else 1)
+            self.assertGreater(stats.nps, 0)
+            self.game.apply_move(move)
+        self.assertGreater(self.player1.last_stats.tt_probes, 0)
+        self.assertGreater(sum(self.player1.last_stats.cutoffs), 0)
+
+        total = game_agent.SearchStats().merge(self.player1.stats).merge(self.player2.stats)
+        self.assertEqual(total.moves, 2)
+        self.assertEqual(total.nodes, self.player1.stats.nodes + self.player2.stats.nodes)
+        self.assertEqual(total.cutoffs, self.player1.stats.cutoffs)
+
+    def test_heuristic_kernels(self):
+        from isolation import heuristics
+
+        def mobility(game, player):
+            return game.legal_move_count(player), game.legal_move_count(game.get_opponent(player))
+
+        def terminal(game, player, value):
+            if game.is_loser(player):
+                return float("-inf")
+            if game.is_winner(player):
+                return float("inf")
+            return value
+
+        def distance(game, player):
+            r, c = game.get_player_location(player)
+            return ((game.width - r) ** 2 + (game.height - c) ** 2) ** 0.5
+
+        def center(game, player):
+            r, c = game.get_player_location(player)
+            return (game.height / 2. - r) ** 2 + (game.width / 2. - c) ** 2
+
+        references = [
+            (heuristics.weighted_mobility, lambda g, p: mobility(g, p)[0] * 0.5 - mobility(g, p)[1]),
+            (heuristics.mobility_difference, lambda g, p: float(mobility(g, p)[0] - mobility(g, p)[1])),
+            (heuristics.corner_distance,
+             lambda g, p: distance(g, p) - distance(g, g.get_opponent(p))),
+            (heuristics.open_move_score, lambda g, p: terminal(g, p, float(mobility(g, p)[0]))),
+            (heuristics.improved_score,
+             lambda g, p: terminal(g, p, float(mobility(g, p)[0] - mobility(g, p)[1]))),
+            (heuristics.center_score, lambda g, p: terminal(g, p, center(g, p))),
+        ]
+        for seed in range(40):
+            game = isolation.Board(self.player1, self.player2, 5 + seed % 3, 7 - seed % 3,
+                                   seed=seed)
+            while True:
+                moves = game.get_legal_moves()
+                if game.move_count >= 2:
+                    for player in (self.player1, self.player2):
+                        for kernel, reference in references:
+                            self.assertEqual(kernel(game, player), reference(game, player))
+                if not moves:
+                    break
+                game.apply_move(moves[0])
+        self.assertEqual(heuristics.weighted_mobility(self.game, self.player1), -24.5)
+
+    def test_transposition_table(self):
+        table = game_agent.TranspositionTable(size=8, replacement="depth")
+        table.store(3, 5, game_agent.EXACT, 1., (0, 0))
+        table.store(11, 2, game_agent.LOWER, 2., (1, 1))
+        self.assertIsNone(table.probe(11))
+        self.assertEqual(table.probe(3)[1:5], (5, game_agent.EXACT, 1., (0, 0)))
+        table.new_search()
+        table.store(11, 2, game_agent.LOWER, 2., (1, 1))
+        self.assertIsNone(table.probe(3))
+        self.assertEqual(table.probe(11)[4], (1, 1))
+
+        with_table = game_agent.AlphaBetaPlayer()
+        without_table = game_agent.AlphaBetaPlayer(tt_size=0)
+        games = []
+        for player in (with_table, without_table):
+            player.time_left = lambda: 1000.
+            game = isolation.Board(player, self.player2)
+            game.apply_move((3, 3))
+            game.apply_move((2, 2))
+            games.append(game)
+        for depth in range(1, 4):
+            values = []
+            for player, game in zip((with_table, without_table), games):
+                player._clock = game_agent.search_clock(player)
+                values.append(player.search_root(game, depth)[1])
+            self.assertEqual(values[0], values[1])
+        self.assertGreater(len(with_table.tt), 0)
+
+    def test_move_ordering(self):
+        ordering = game_agent.MoveOrdering()
+        moves = [(0, 1), (1, 0), (2, 3), (3, 2)]
+        ordering.cutoff((3, 2), 2, 1)
+        ordering.cutoff((1, 0), 4, 3)
+        self.assertEqual(ordering.order(self.game, list(moves), 2, hash_move=(2, 3)),
+                         [(2, 3), (3, 2), (1, 0), (0, 1)])
+        self.assertEqual(ordering.order(self.game, list(moves), 0),
+                         [(1, 0), (3, 2), (0, 1), (2, 3)])
+        ordering.new_search()
+        self.assertEqual(ordering.order(self.game, list(moves), 2)[0], (1, 0))
+
+    def test_principal_variation_search(self):
+        players = [game_agent.AlphaBetaPlayer(tt_size=0, move_ordering=None),
+                   game_agent.AlphaBetaPlayer(pvs=True),
+                   game_agent.AlphaBetaPlayer(pvs=True, aspiration=0.5)]
+        games = []
+        for player in players:
+            player.time_left = lambda: 1000.
+            game = isolation.Board(player, self.player2, shuffle=False)
+            game.apply_move((3, 3))
+            game.apply_move((2, 2))
+            player.start_search(game)
+            games.append(game)
+        for depth in range(1, 5):
+            values = []
+            for player, game in zip(players, games):
+                self.assertIn(player.alphabeta(game, depth), game.get_legal_moves())
+                values.append(player._root_value)
+            self.assertEqual(values[0], values[1])
+            self.assertEqual(values[0], values[2])
+
+    def test_mtdf(self):
+        plain = game_agent.AlphaBetaPlayer(tt_size=0, move_ordering=None)
+        mtdf = game_agent.MTDfPlayer()
+        games = []
+        for player in (plain, mtdf):
+            player.time_left = lambda: 1000.
+            game = isolation.Board(player, self.player2, shuffle=False)
+            game.apply_move((3, 3))
+            game.apply_move((2, 2))
+            player.start_search(game)
+            games.append(game)
+        for depth in range(1, 5):
+            plain.alphabeta(games[0], depth)
+            self.assertIn(mtdf.alphabeta(games[1], depth), games[1].get_legal_moves())
+            self.assertEqual(plain._root_value, mtdf._root_value)
+        self.assertGreaterEqual(mtdf.passes, 4)
+        with self.assertRaises(ValueError):
+            game_agent.MTDfPlayer(tt_size=0)
+        with self.assertRaises(ValueError):
+            game_agent.MTDfPlayer(aspiration=0.5)
+        player = game_agent.MTDfPlayer(endgame=None, time_manager=None, pvs=True)
+        self.assertIsNone(player.endgame)
+        self.assertIsNone(player.time_manager)
+        self.assertTrue(player.pvs)
+
+    def test_parallel_root_search(self):
+        reload(parallel_search)
+        serial = game_agent.AlphaBetaPlayer(tt_size=0, move_ordering=None)
+        parallel = parallel_search.ParallelAlphaBetaPlayer(workers=2)
+        self.addCleanup(parallel.close)
+        parallel.start_pool()
+        games = []
+        for player in (serial, parallel):
+            player.time_left = isolation.Deadline(1000)
+            game = isolation.Board(player, self.player2, shuffle=False)
+            game.apply_move((3, 3))
+            game.apply_move((2, 2))
+            player.start_search(game)
+            games.append(game)
+        for depth in range(1, 4):
+            serial._clock = game_agent.search_clock(serial)
+            parallel._clock = game_agent.search_clock(parallel)
+            self.assertEqual(serial.search_root(games[0], depth)[1],
+                             parallel.search_root(games[1], depth)[1])
+
+        move = parallel.get_move(games[1].snapshot(), isolation.Deadline(100))
+        self.assertIn(move, games[1].get_legal_moves())
+        self.assertGreater(parallel.utilization, 0)
+        self.assertTrue(parallel_search.ParallelAlphaBetaPlayer(symmetry=True)
+                        ._player_kwargs["symmetry"])
+
+        configured = parallel_search.ParallelAlphaBetaPlayer(workers=1, move_ordering=None,
+                                                            endgame=None, aspiration=1.)
+        self.addCleanup(configured.close)
+        self.assertIsNone(configured.move_ordering)
+        self.assertIsNone(configured.endgame)
+        self.assertEqual(configured.aspiration, 1.)
+        self.assertEqual(configured._player_kwargs["aspiration"], 1.)
+        game = isolation.Board(configured, self.player2)
+        game.apply_move((3, 3))
+        game.apply_move((2, 2))
+        self.assertIn(configured.get_move(game.snapshot(), isolation.Deadline(100)),
+                      game.get_legal_moves())
+
+    def test_lazy_smp(self):
+        reload(parallel_search)
+        table = parallel_search.SharedTranspositionTable(size=8)
+        self.addCleanup(table.close)
+        table.store(3, 5, game_agent.EXACT, 1., (0, 0))
+        table.store(11, 2, game_agent.LOWER, 2., (1, 1))
+        self.assertIsNone(table.probe(11))
+        self.assertEqual(table.probe(3), (3, 5, game_agent.EXACT, 1., (0, 0), 0))
+        table.new_search()
+        table.store(11, 2, game_agent.UPPER, float("-inf"), None)
+        self.assertIsNone(table.probe(3))
+        self.assertEqual(table.probe(11)[1:5], (2, game_agent.UPPER, float("-inf"), None))
+        table.clear()
+        self.assertEqual(len(table), 0)
+
+        # The shared memory block is removed when its table is collected
+        name = parallel_search.SharedTranspositionTable(size=8).name
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+        player = parallel_search.LazySMPPlayer(workers=2)
+        self.addCleanup(player.close)
+        self.assertIsNone(player.tt)
+        game = isolation.Board(player, self.player2)
+        game.apply_move((3, 3))
+        game.apply_move((2, 2))
+        move = player.get_move(game.snapshot(), isolation.Deadline(100))
+        self.assertIn(move, game.get_legal_moves())
+        self.assertGreater(len(player.tt), 0)
+
+        # A root without legal moves must not leave the workers searching
+        stuck = isolation.Board(player, self.player2, 3, 3)
+        stuck.apply_move((1, 1))
+        stuck.apply_move((0, 0))
+        self.assertEqual(player.get_move(stuck.snapshot(), isolation.Deadline(100)), (-1, -1))
+        deadline = isolation.Deadline(100)
+        self.assertIn(player.get_move(game.snapshot(), deadline), game.get_legal_moves())
+        self.assertGreater(deadline(), 0)
+
+        configured = parallel_search.LazySMPPlayer(workers=1, move_ordering=None, endgame=None,
+                                                   aspiration=1.)
+        self.addCleanup(configured.close)
+        self.assertIsNone(configured.endgame)
+        self.assertEqual(configured._player_kwargs["aspiration"], 1.)
+        helper = parallel_search._Helper(1, None, **configured._player_kwargs)
+        self.assertIsNone(helper.move_ordering)
+        self.assertIsNone(helper.endgame)
+        board = isolation.Board(configured, self.player2)
+        board.apply_move((3, 3))
+        board.apply_move((2, 2))
+        self.assertIn(configured.get_move(board.snapshot(), isolation.Deadline(100)),
+                      board.get_legal_moves())
+
+        name = player.tt.name
+        with player:
+            pass
+        self.assertIsNone(player.tt)
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+    def test_pondering(self):
+        reload(parallel_search)
+        with self.assertRaises(ValueError):
+            parallel_search.LazySMPPlayer(ponder="sometimes")
+        player = parallel_search.LazySMPPlayer(workers=1, ponder="predicted")
+        self.addCleanup(player.close)
+        game = isolation.Board(player, self.player2)
+        game.apply_move((3, 3))
+        game.apply_move((2, 2))
+        move = player.get_move(game.snapshot(), isolation.Deadline(50))
+        game.apply_move(move)
+        reply = player.tt.probe(game.zobrist_key)[4]
+        game.apply_move(reply)
+        self.assertEqual(player._predicted, game.zobrist_key)
+
+        deadline = isolation.Deadline(50)
+        self.assertIn(player.get_move(game.snapshot(), deadline), game.get_legal_moves())
+        self.assertGreater(deadline(), 0)
+        self.assertEqual(player.ponder_hits, 1)
+
+        # Pondering ends after twice the time limit of the last turn, so the
+        # worker is free again well before the 60 s absolute limit
+        self.assertIn(player.get_move(game.snapshot(), isolation.Deadline(20)),
+                      game.get_legal_moves())
+        self.assertEqual(player._pool.apply_async(int).get(5), 0)
+
+        stuck = isolation.Board(player, self.player2, 3, 3)
+        stuck.apply_move((0, 0))
+        stuck.apply_move((1, 1))
+        self.assertFalse(player.start_pondering(stuck, (1, 2)))
+
+        # Stopping and starting the workers must fit in every turn
+        game = isolation.Board(player, self.player2)
+        for _ in range(8):
+            deadline = isolation.Deadline(20)
+            move = player.get_move(game.snapshot(), deadline)
+            self.assertGreater(deadline(), 0)
+            if move == (-1, -1):
+                break
+            game.apply_move(move)
+            replies = game.get_legal_moves()
+            if not replies:
+                break
+            game.apply_move(replies[0])
+
+    def test_endgame_solver(self):
+        player = game_agent.AlphaBetaPlayer()
+        game = isolation.Board(player, self.player2, 3, 3)
+        game.apply_move((0, 0))
+        game.apply_move((2, 2))
+        self.assertFalse(game.is_partitioned())
+        game.apply_move((1, 2))
+        game.apply_move((1, 0))
+        self.assertTrue(game.is_partitioned())
+        self.assertEqual(isolation.EndgameSolver().solve(game), (False, (2, 0), 2, 2))
+
+        player.time_left = lambda: 1000.
+        self.assertEqual(player.solve_endgame(game), (2, 0))
+        player._clock = game_agent.search_clock(player)
+        self.assertEqual(player.endgame_value(game), float("-inf"))
+
+    def test_opening_book(self):
+        reload(opening_book)
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "book.bin")
+        self.assertEqual(opening_book.generate_book(path, plies=2, depth=2, width=5, height=5),
+                         1 + 6)
+        book = isolation.OpeningBook(path)
+        self.addCleanup(os.rmdir, directory)
+        self.addCleanup(os.remove, path)
+        self.addCleanup(book.close)
+        self.assertEqual(len(book), 7)
+
+        player = game_agent.AlphaBetaPlayer(book=book)
+        game = isolation.Board(player, self.player2, 5, 5)
+        move = player.get_move(game.snapshot(), lambda: 1000.)
+        self.assertEqual(move, book.lookup(game))
+        game.apply_move(move)
+        mirrored = isolation.Board(self.player2, player, 5, 5)
+        mirrored.apply_move((move[0], 4 - move[1]))
+        reply = book.lookup(mirrored)
+        self.assertEqual(book.lookup(game), (reply[0], 4 - reply[1]))
+        game.apply_move(reply)
+        self.assertIsNone(book.lookup(game))
+        self.assertIsNone(book.lookup(isolation.Board(player, self.player2)))
+
+    def test_mcts_agent(self):
+        player = game_agent.MCTSPlayer(seed=0)
+        game = isolation.Board(player, self.player2, 5, 5)
+        game.apply_move((2, 2))
+        game.apply_move((0, 0))
+        move = player.get_move(game.snapshot(), isolation.Deadline(50))
+        self.assertIn(move, game.get_legal_moves())
+        self.assertGreater(player.playouts, 0)
+        self.assertGreater(player.playouts_per_second, 0)
+
+        game.apply_move(move)
+        game.apply_move(game.get_legal_moves()[0])
+        root = player.reuse_tree(game)
+        self.assertEqual(root.key, game.zobrist_key)
+        self.assertGreater(root.visits, 0)
+
+        playout_board = game.copy()
+        self.assertIn(playout_board.random_playout(), (player, self.player2))
+        self.assertEqual(playout_board.zobrist_key, game.zobrist_key)
+
+    def test_alphabeta_symmetry_folding(self):
+        player = game_agent.AlphaBetaPlayer(symmetry=True)
+        game = isolation.Board(player, self.player2)
+        self.assertEqual(len(player.legal_moves(game)), 10)
+        game.apply_move((3, 3))
+        self.assertEqual(len(player.legal_moves(game)), 9)
+        game.apply_move((2, 2))
+        self.assertEqual(len(player.legal_moves(game)), 4)
+
+
+class BoardTest(unittest.TestCase):
+    """Unit tests for the isolation.Board game model"""
+
+    def setUp(self):
+        self.player1 = "Player1"
+        self.player2 = "Player2"
+        self.game = isolation.Board(self.player1, self.player2)
+
+    def test_knight_moves(self):
+        self.game.apply_move((3, 3))
+        self.game.apply_move((1, 5))
+        self.assertEqual(sorted(self.game.get_legal_moves()),
+                         [(1, 2), (1, 4), (2, 1), (2, 5),
+                          (4, 1), (4, 5), (5, 2), (5, 4)])
+        self.assertEqual(sorted(self.game.get_legal_moves(self.player2)),
+                         [(0, 3), (2, 3), (3, 4), (3, 6)])
+        self.assertFalse(self.game.move_is_legal((1, 5)))
+        self.assertEqual(len(self.game.get_blank_spaces()), 47)
+        self.assertEqual(self.game.get_player_location(self.player2), (1, 5))
+
+    def test_fixed_move_order(self):
+        game = isolation.Board(self.player1, self.player2, shuffle=False)
+        game.apply_move((3, 3))
+        game.apply_move((1, 5))
+        moves = game.get_legal_moves()
+        self.assertEqual(moves, game.copy().get_legal_moves())
+        self.assertEqual(moves, [(1, 2), (1, 4), (2, 1), (2, 5),
+                                 (4, 1), (4, 5), (5, 2), (5, 4)])
+
+    def test_push_pop_move(self):
+        self.game.apply_move((3, 3))
+        before = self.game.to_string()
+        for move in [(1, 5), (1, 2), (0, 3)]:
+            self.game.push_move(move)
+        self.assertEqual(self.game.move_count, 4)
+        self.assertEqual(self.game.pop_move(), (0, 3))
+        self.assertEqual(self.game.pop_move(), (1, 2))
+        self.assertEqual(self.game.pop_move(), (1, 5))
+        self.assertEqual(self.game.to_string(), before)
+        self.assertEqual(self.game.active_player, self.player2)
+        self.assertEqual(self.game.get_player_location(self.player1), (3, 3))
+
+    def test_zobrist_key(self):
+        transposed = isolation.Board(self.player1, self.player2)
+        for p1_move, p2_move in [((2, 1), (6, 6)), ((0, 0), (4, 5)),
+                                 ((1, 2), (6, 4))]:
+            self.game.apply_move(p1_move)
+            self.game.apply_move(p2_move)
+        for p1_move, p2_move in [((1, 2), (6, 6)), ((0, 0), (4, 5)),
+                                 ((2, 1), (6, 4))]:
+            transposed.push_move(p1_move)
+            transposed.push_move(p2_move)
+        self.game.apply_move((3, 3))
+        transposed.push_move((3, 3))
+        self.assertEqual(self.game.zobrist_key, transposed.zobrist_key)
+        self.assertEqual(self.game.hash(), self.game.copy().hash())
+
+        transposed.pop_move()
+        self.assertNotEqual(self.game.zobrist_key, transposed.zobrist_key)
+        while transposed.move_count:
+            transposed.pop_move()
+        self.assertEqual(transposed.zobrist_key, 0)
+
+    def test_snapshot_is_read_only(self):
+        self.game.apply_move((3, 3))
+        snapshot = self.game.snapshot()
+        self.assertRaises(RuntimeError, snapshot.apply_move, (1, 5))
+        self.assertRaises(RuntimeError, snapshot.push_move, (1, 5))
+        child = snapshot.forecast_move((1, 5))
+        self.assertEqual(child.move_count, 2)
+        self.assertEqual(snapshot.move_count, 1)
+        self.assertEqual(snapshot.zobrist_key, self.game.zobrist_key)
+        self.assertIs(type(snapshot.copy()), isolation.Board)
+
+    @unittest.skipUnless(hasattr(isolation, "BoardBatch"), "requires numpy")
+    def test_board_batch_round_trip(self):
+        self.game.apply_move((3, 3))
+        self.game.apply_move((1, 5))
+        other = self.game.forecast_move((5, 4))
+        batch = isolation.BoardBatch.from_boards([self.game, other])
+        self.assertEqual(list(batch.mobility()), [8, 4])
+        self.assertEqual(list(batch.is_terminal()), [False, False])
+        batch.apply_moves([(1, 2), (0, 3)])
+        for board, move in zip([self.game, other], [(1, 2), (0, 3)]):
+            board.apply_move(move)
+        for board, rebuilt in zip([self.game, other], batch.to_boards()):
+            self.assertEqual(board.to_string(), rebuilt.to_string())
+            self.assertEqual(board.zobrist_key, rebuilt.zobrist_key)
+            self.assertEqual(board.active_player, rebuilt.active_player)
+
+    def test_blank_space_order(self):
+        # Column by column, top to bottom, as the list-based board did
+        game = isolation.Board(self.player1, self.player2, 3, 4)
+        game.apply_move((1, 0))
+        game.apply_move((2, 2))
+        expected = [(0, 0), (2, 0), (3, 0),
+                    (0, 1), (1, 1), (2, 1), (3, 1),
+                    (0, 2), (1, 2), (3, 2)]
+        self.assertEqual(game.get_blank_spaces(), expected)
+        geometry = game._geometry
+        mask = sum(1 << (r + c * 4) for r, c in expected)
+        self.assertEqual(geometry.mask_coords(mask), expected)
+
+        # Spans several bytes of the mask
+        game = isolation.Board(self.player1, self.player2)
+        self.assertEqual(game.get_blank_spaces(),
+                         [(r, c) for c in range(7) for r in range(7)])
+
+    def test_deepcopy_and_pickle(self):
+        import copy
+        import pickle
+        for seed in (None, 7):
+            game = isolation.Board(self.player1, self.player2, seed=seed)
+            game.apply_move((3, 3))
+            game.apply_move((1, 5))
+            for clone in (copy.deepcopy(game), pickle.loads(pickle.dumps(game))):
+                self.assertEqual(clone.to_string(), game.to_string())
+                self.assertEqual(clone.zobrist_key, game.zobrist_key)
+                self.assertEqual(sorted(clone.get_legal_moves()), sorted(game.get_legal_moves()))
+                clone.apply_move(clone.get_legal_moves()[0])
+                self.assertEqual(game.move_count, 2)
+
+    @unittest.skipUnless(hasattr(isolation, "BoardBatch"), "requires numpy")
+    def test_numpy_integer_moves(self):
+        import numpy as np
+        self.game.apply_move((np.int64(3), np.int64(3)))
+        self.game.push_move((np.int64(1), np.int64(5)))
+        self.assertEqual(self.game.legal_move_count(), 8)
+        self.assertEqual(len(self.game.get_blank_spaces()), 47)
+        self.assertTrue(self.game.move_is_legal((np.int64(1), np.int64(2))))
+        self.assertTrue(self.game._is_legal_active_move((np.int64(1), np.int64(2))))
+        self.assertIs(type(self.game._occupied), int)
+        self.assertEqual(self.game.pop_move(), (1, 5))
+        self.assertEqual(self.game.legal_move_count(), 48)
+
+    def test_binary_round_trip(self):
+        self.game.apply_move((3, 3))
+        self.game.apply_move((1, 5))
+        data = self.game.to_bytes()
+        self.assertEqual(len(data), isolation.Board.record_size(7, 7))
+        decoded = isolation.Board.from_bytes(data, self.player1, self.player2)
+        self.assertEqual(decoded.to_string(), self.game.to_string())
+        self.assertEqual(decoded.zobrist_key, self.game.zobrist_key)
+        self.assertEqual(decoded.active_player, self.player1)
+
+        boards = [isolation.Board(self.player1, self.player2), self.game,
+                  self.game.forecast_move((5, 4))]
+        packed = isolation.Board.pack_many(boards)
+        unpacked = isolation.Board.unpack_many(packed, self.player1, self.player2)
+        self.assertEqual([b.zobrist_key for b in unpacked],
+                         [b.zobrist_key for b in boards])
+        self.assertEqual([b.move_count for b in unpacked], [0, 2, 3])
+
+    def test_canonical_key(self):
+        mirrored = isolation.Board(self.player1, self.player2)
+        for move in [(3, 3), (1, 5), (5, 4)]:
+            self.game.apply_move(move)
+            mirrored.apply_move((move[0], 6 - move[1]))
+        self.assertNotEqual(self.game.zobrist_key, mirrored.zobrist_key)
+        key, transform = self.game.canonical_key()
+        mirrored_key, mirrored_transform = mirrored.canonical_key()
+        self.assertEqual(key, mirrored_key)
+        self.assertEqual(mirrored.transform_move(
+            self.game.transform_move((4, 2), transform), mirrored_transform, inverse=True),
+            (4, 4))
+        self.assertEqual(self.game.symmetries(), [])
+        self.assertEqual(isolation.Board(1, 2).symmetries(), list(range(1, 8)))
+
+    def test_reachable(self):
+        game = isolation.Board(self.player1, self.player2, 3, 3)
+        self.assertEqual(game.reachable(), (1 << 9) - 1)
+        game.apply_move((0, 0))
+        game.apply_move((1, 1))
+        # The centre is unreachable for a knight on a 3x3 board
+        self.assertEqual(game.reachable(self.player1), (1 << 9) - 1 - (1 << 0) - (1 << 4))
+        self.assertEqual(game.reachable(self.player2), 0)
+        self.assertTrue(game.is_partitioned())
+
+    def test_legal_move_counts(self):
+        self.assertEqual(self.game.legal_move_count(), 49)
+        self.game.apply_move((0, 0))
+        self.game.apply_move((1, 2))
+        self.assertEqual(self.game.legal_move_count(self.player1), 1)
+        self.assertEqual(self.game.legal_move_count(self.player2), 5)
+        self.game.apply_move((2, 1))
+        self.game.apply_move((3, 3))
+        self.assertTrue(self.game.has_legal_moves())
+        self.assertEqual(self.game.legal_move_count(), 4)
+
+        # The cached move list is never handed out directly
+        moves = self.game.get_legal_moves()
+        moves.append((9, 9))
+        self.assertEqual(len(self.game.get_legal_moves()), 4)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -4,6 +4,11 @@ and include the results in your report.
 """
 import random
 import math
+import time
+
+from isolation import Board, heuristics
+from isolation.book import OpeningBook
+from isolation.endgame import EndgameSolver
 
 
 class SearchTimeout(Exception):
@@ -11,6 +16,358 @@ class SearchTimeout(Exception):
     pass
 
 
+class SearchClock(object):
+    """Amortized timeout checks for a search.
+
+    Calling `time_left()` at every node of the search costs a timer read and
+    a few function calls. Instead, search functions call `tick()` at every
+    node, and the clock is only read every `interval` nodes. After each read
+    the interval is re-estimated from the measured node rate so that the
+    next read happens well before the remaining time can drop below the
+    threshold; close to the threshold the clock is read at every node again,
+    so the search times out no later than with per-node checks.
+
+    Parameters
+    ----------
+    time_left : callable
+        A function that returns the number of milliseconds left in the
+        current turn (e.g., an `isolation.Deadline`).
+
+    threshold : float
+        Time remaining (in milliseconds) when search is aborted.
+    """
+    # Fraction of the remaining slack that may elapse between two reads, and
+    # an absolute bound (in milliseconds) on the time between two reads
+    SLACK_FRACTION = 0.1
+    MAX_GAP = 1.
+    MAX_INTERVAL = 1024
+
+    __slots__ = ("time_left", "threshold", "interval", "countdown", "nodes", "expired",
+                 "_last_remaining", "_ms_per_node")
+
+    def __init__(self, time_left, threshold):
+        self.time_left = time_left
+        self.threshold = threshold
+        self.interval = 1
+        self.countdown = 0
+        self.nodes = 0
+        self.expired = None
+        self._last_remaining = None
+        self._ms_per_node = 0.
+
+    @property
+    def count(self):
+        """The number of nodes counted by tick() so far."""
+        if not self.nodes or self.expired is not None:
+            return self.nodes
+        return self.nodes + self.interval - self.countdown
+
+    def tick(self):
+        """Count one search node and raise `SearchTimeout` if the time left
+        has dropped below the threshold.
+        """
+        self.countdown -= 1
+        if self.countdown <= 0:
+            self.check()
+
+    def check(self):
+        """Read the clock now and pick the number of nodes until the next
+        read; raise `SearchTimeout` if the time is up.
+        """
+        remaining = self.time_left()
+        self.nodes += self.interval
+        if remaining < self.threshold:
+            self.countdown = 0
+            self.expired = remaining
+            raise SearchTimeout()
+
+        last, self._last_remaining = self._last_remaining, remaining
+        budget = min((remaining - self.threshold) * self.SLACK_FRACTION, self.MAX_GAP)
+        if last is not None and last > remaining:
+            # Adapt quickly to slower nodes but only slowly to faster ones
+            self._ms_per_node = max((last - remaining) / self.interval, 0.5 * self._ms_per_node)
+            self.interval = max(1, min(self.MAX_INTERVAL, int(budget / self._ms_per_node)))
+        elif self._ms_per_node:
+            # No time elapsed on a coarse timer: the interval may shrink as
+            # the slack runs out, but only a measured node rate can grow it
+            self.interval = max(1, min(self.interval, int(budget / self._ms_per_node)))
+        self.countdown = self.interval
+
+
+def search_clock(player):
+    """Return the `SearchClock` of a player for its current `time_left`
+    function, creating a new clock when the player starts a new turn. The
+    threshold is the margin of the player's `TimeManager` if it has one.
+    """
+    threshold = player.TIMER_THRESHOLD
+    manager = getattr(player, "time_manager", None)
+    if manager is not None:
+        threshold = manager.margin
+    clock = getattr(player, "_clock", None)
+    if clock is None or clock.time_left is not player.time_left or clock.threshold != threshold:
+        clock = SearchClock(player.time_left, threshold)
+    return clock
+
+
+# Placeholder for the other player of a board searched on its own (e.g., by
+# a worker process, which only receives the position)
+_OPPONENT = "opponent"
+
+
+def board_for(record, player, to_move=True):
+    """Decode a `Board.to_bytes()` record with `player` as the side to move
+    (or, if `to_move` is False, as the side that has just moved).
+    """
+    side = Board.from_bytes(record, _OPPONENT, _OPPONENT).move_count & 1
+    players = (_OPPONENT, player) if side == to_move else (player, _OPPONENT)
+    return Board.from_bytes(record, *players)
+
+
+class TimeManager(object):
+    """Time allocation for iterative deepening.
+
+    After every completed iteration the manager estimates the effective
+    branching factor (the ratio between the node counts of consecutive
+    iterations, averaged over the last two ratios to smooth out the
+    difference between odd and even depths) and the cost per node, and
+    predicts the time the next iteration needs. The next iteration is only
+    started if it is predicted to finish before the time left drops below
+    the safety margin, since an unfinished iteration is thrown away.
+
+    The safety margin (the threshold at which the search is aborted) starts
+    at the player's timeout and is then calibrated from the timer overhead
+    observed after every aborted search: the time between the clock read
+    that raised `SearchTimeout` and get_move() returning, plus the largest
+    gap between two clock reads. Time spent by the caller after get_move()
+    returns cannot be observed, so by default the calibration only raises
+    the margin above its initial value.
+
+    Parameters
+    ----------
+    margin : float (optional)
+        The initial safety margin in milliseconds.
+
+    stable_iterations : int (optional)
+        If given, stop after this many consecutive iterations have returned
+        the same best move (once at least STABLE_FRACTION of the time has
+        been used). The time of one turn cannot be saved for later turns,
+        so this only saves work and is disabled by default.
+
+    min_margin : float (optional)
+        The lower bound of the calibrated margin; defaults to `margin`.
+        A smaller value lets the margin shrink towards the observed
+        overhead.
+
+    Attributes
+    ----------
+    margin : float
+        The current safety margin in milliseconds.
+
+    iterations : list of (int, int, float)
+        The (depth, nodes, milliseconds) of every iteration completed in the
+        current turn.
+    """
+    # Multiplier applied to the observed overhead, and decay of the largest
+    # observed overhead per turn
+    SAFETY = 2.
+    DECAY = 0.9
+
+    # Fraction of the turn that must have been used before a stable best
+    # move ends the search
+    STABLE_FRACTION = 0.25
+
+    # Iterations with fewer nodes (mostly answered by the transposition
+    # table) are too small to estimate the branching factor from, which is
+    # never more than the largest number of knight moves
+    MIN_NODES = 64
+    MAX_BRANCHING = 8.
+
+    def __init__(self, margin=10., stable_iterations=None, min_margin=None):
+        self.margin = margin
+        self.min_margin = margin if min_margin is None else min_margin
+        self.stable_iterations = stable_iterations
+        self.iterations = []
+        self.overhead = None
+        self._time_left = None
+        self._budget = 0.
+        self._remaining = 0.
+        self._nodes = 0
+        self._best_move = None
+        self._stable = 0
+        self._proven = False
+
+    def new_turn(self, time_left, nodes=0):
+        """Start timing a new call to get_move().
+
+        Parameters
+        ----------
+        time_left : callable
+            The time_left function of the turn.
+
+        nodes : int (optional)
+            The node count of the search clock before the first iteration.
+        """
+        self._time_left = time_left
+        self._budget = self._remaining = time_left()
+        self._nodes = nodes
+        self.iterations = []
+        self._best_move = None
+        self._stable = 0
+        self._proven = False
+
+    def iteration_done(self, depth, nodes, best_move, value):
+        """Record a completed iteration; `nodes` is the node count of the
+        search clock after the iteration.
+        """
+        remaining = self._time_left()
+        self.iterations.append((depth, nodes - self._nodes, self._remaining - remaining))
+        self._remaining, self._nodes = remaining, nodes
+        self._stable = self._stable + 1 if best_move == self._best_move else 1
+        self._best_move = best_move
+        self._proven = abs(value) == float("inf")
+
+    def branching_factor(self):
+        """Return the estimated effective branching factor, or None before
+        two iterations with at least MIN_NODES nodes have completed.
+        """
+        ratios = [b[1] / a[1] for a, b in zip(self.iterations[-3:], self.iterations[-2:])
+                  if a[1] >= self.MIN_NODES]
+        if not ratios:
+            return None
+        product = 1.
+        for ratio in ratios:
+            product *= ratio
+        return min(self.MAX_BRANCHING, max(1., product ** (1. / len(ratios))))
+
+    def predict(self):
+        """Return the predicted duration (in milliseconds) of the next
+        iteration, or 0 if there is not enough data.
+        """
+        ebf = self.branching_factor()
+        if ebf is None:
+            return 0.
+        return self.iterations[-1][2] * ebf
+
+    def should_continue(self):
+        """Return True if the next iteration should be started."""
+        if self._proven:
+            return False
+        remaining = self._time_left()
+        if self.stable_iterations is not None and self._stable >= self.stable_iterations \
+                and self._budget - remaining >= self.STABLE_FRACTION * self._budget:
+            return False
+        return self.predict() < remaining - self.margin
+
+    def end_turn(self, clock):
+        """Calibrate the margin from the search clock of the finished turn."""
+        if clock is None or clock.expired is None or clock.time_left is not self._time_left:
+            return
+        overhead = max(0., clock.expired - self._time_left())
+        if self.overhead is not None:
+            overhead = max(overhead, self.DECAY * self.overhead)
+        self.overhead = overhead
+        self.margin = max(self.min_margin, self.SAFETY * self.overhead + SearchClock.MAX_GAP)
+
+
+class SearchStats(object):
+    """Counters describing the work done by the searches of a player.
+
+    Players keep one `SearchStats` for their last call to get_move() and
+    one that accumulates every call; stats of several players (e.g., all
+    the players of a tournament) can be added up with merge().
+
+    Attributes
+    ----------
+    moves : int
+        The number of get_move() calls.
+
+    nodes : int
+        The number of search nodes visited.
+
+    leaf_evals : int
+        The number of calls to the evaluation function.
+
+    cutoffs : list of int
+        cutoffs[i] is the number of beta cutoffs caused by the i-th move
+        searched at a node; with good move ordering most cutoffs are caused
+        by the first move.
+
+    depth : int
+        The sum over all moves of the deepest completed search iteration.
+
+    iteration_times : list of float
+        The duration (in milliseconds) of every completed iteration.
+
+    time : float
+        The total duration of the get_move() calls in milliseconds.
+
+    tt_probes, tt_hits : int
+        The number of transposition table lookups and of lookups that found
+        an entry for the position.
+    """
+
+    def __init__(self):
+        self.moves = 0
+        self.nodes = 0
+        self.leaf_evals = 0
+        self.cutoffs = []
+        self.depth = 0
+        self.iteration_times = []
+        self.time = 0.
+        self.tt_probes = 0
+        self.tt_hits = 0
+
+    def __repr__(self):
+        return ("SearchStats(moves={}, nodes={}, nps={:.0f}, mean_depth={:.2f}, "
+                "tt_hit_rate={:.3f}, first_move_cutoffs={:.3f})").format(
+                    self.moves, self.nodes, self.nps, self.mean_depth,
+                    self.tt_hit_rate, self.first_move_cutoffs)
+
+    @property
+    def nps(self):
+        """Nodes searched per second."""
+        return 1000. * self.nodes / self.time if self.time else 0.
+
+    @property
+    def mean_depth(self):
+        """The mean depth completed per move."""
+        return self.depth / self.moves if self.moves else 0.
+
+    @property
+    def tt_hit_rate(self):
+        """The fraction of transposition table lookups that found an entry."""
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.
+
+    @property
+    def first_move_cutoffs(self):
+        """The fraction of cutoffs caused by the first move searched."""
+        total = sum(self.cutoffs)
+        return self.cutoffs[0] / total if total else 0.
+
+    def cutoff(self, index):
+        """Count a cutoff caused by the index-th move searched at a node."""
+        cutoffs = self.cutoffs
+        while len(cutoffs) <= index:
+            cutoffs.append(0)
+        cutoffs[index] += 1
+
+    def merge(self, other):
+        """Add the counters of `other` to these ones and return self."""
+        self.moves += other.moves
+        self.nodes += other.nodes
+        self.leaf_evals += other.leaf_evals
+        cutoffs = self.cutoffs
+        cutoffs.extend([0] * (len(other.cutoffs) - len(cutoffs)))
+        for index, count in enumerate(other.cutoffs):
+            cutoffs[index] += count
+        self.depth += other.depth
+        self.iteration_times.extend(other.iteration_times)
+        self.time += other.time
+        self.tt_probes += other.tt_probes
+        self.tt_hits += other.tt_hits
+        return self
+
+
 def custom_score(game, player):
     """Calculate the heuristic value of a game state from the point of view
     of the given player.
@@ -35,16 +392,8 @@ def custom_score(game, player):
     float
         The heuristic value of the current game state to the specified player.
     """
-    score = 0
-
-    opponent = game.get_opponent(player)
-
-    our_moves = float(len(game.get_legal_moves(player)))
-    their_moves = float(len(game.get_legal_moves(opponent)))
-
-    score += our_moves * 0.5 - their_moves
-
-    return score
+    # Half of our moves minus all of theirs
+    return heuristics.weighted_mobility(game, player)
 
 
 def custom_score_2(game, player):
@@ -69,13 +418,9 @@ def custom_score_2(game, player):
     float
         The heuristic value of the current game state to the specified player.
     """
-    our_position = game.get_player_location(player)
-    our_distance_to_center = math.sqrt((game.width - our_position[0]) ** 2 + (game.height - our_position[1]) ** 2)
-
-    their_position = game.get_player_location(game.get_opponent(player))
-    their_distance_to_center = math.sqrt((game.width - their_position[0]) ** 2 + (game.height - their_position[1]) ** 2)
-
-    return our_distance_to_center - their_distance_to_center
+    # Our distance from the point (width, height) in (row, column)
+    # coordinates minus theirs, from a per-cell table
+    return heuristics.corner_distance(game, player)
 
 
 
@@ -101,7 +446,181 @@ def custom_score_3(game, player):
     float
         The heuristic value of the current game state to the specified player.
     """
-    return float(len(game.get_legal_moves(player))) - float(len(game.get_legal_moves(game.get_opponent(player))))
+    # Our moves minus theirs
+    return heuristics.mobility_difference(game, player)
+
+
+# Sentinel for keyword arguments whose default value is built per instance
+DEFAULT = object()
+
+# Bound types of transposition table entries
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+def bound_type(value, alpha, beta):
+    """Classify a fail-soft search result obtained with the window
+    (alpha, beta) as an EXACT value, a LOWER bound or an UPPER bound.
+    """
+    if value <= alpha:
+        return UPPER
+    if value >= beta:
+        return LOWER
+    return EXACT
+
+
+def tt_cutoff(entry, alpha, beta):
+    """Test whether a transposition table entry (searched deep enough) is
+    sufficient to return its value for the window (alpha, beta).
+    """
+    flag, value = entry[2], entry[3]
+    return (flag == EXACT or
+            (flag == LOWER and value >= beta) or
+            (flag == UPPER and value <= alpha))
+
+
+class TranspositionTable(object):
+    """A fixed-size table of search results indexed by position keys.
+
+    Every entry is a tuple (key, depth, bound, value, move, generation):
+    the full position key (to detect index collisions), the remaining search
+    depth below the position, the bound type (EXACT, LOWER or UPPER), the
+    value, the best move found, and the search generation that stored it.
+
+    Parameters
+    ----------
+    size : int (optional)
+        The number of entries; positions are mapped to a slot by
+        ``key % size``.
+
+    replacement : str (optional)
+        What happens when a new result maps onto a slot that holds a
+        different position. "always" overwrites the slot. "depth" keeps the
+        old entry if it was stored during the current search generation and
+        searched deeper than the new result.
+    """
+    REPLACEMENT_POLICIES = ("always", "depth")
+
+    def __init__(self, size=1 << 16, replacement="depth"):
+        if replacement not in self.REPLACEMENT_POLICIES:
+            raise ValueError("Unknown replacement policy: {}".format(replacement))
+        self.size = size
+        self.replacement = replacement
+        self.generation = 0
+        self._entries = [None] * size
+
+    def __len__(self):
+        return sum(entry is not None for entry in self._entries)
+
+    def probe(self, key):
+        """Return the entry stored for `key`, or None."""
+        entry = self._entries[key % self.size]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key, depth, bound, value, move):
+        """Store a search result, subject to the replacement policy."""
+        slot = key % self.size
+        old = self._entries[slot]
+        if (old is not None and old[0] != key and self.replacement == "depth" and
+                old[5] == self.generation and old[1] > depth):
+            return
+        self._entries[slot] = (key, depth, bound, value, move, self.generation)
+
+    def new_search(self):
+        """Start a new search generation; entries from older generations
+        become preferred candidates for replacement.
+        """
+        self.generation += 1
+
+    def clear(self):
+        """Remove every entry."""
+        self._entries = [None] * self.size
+
+
+class MoveOrdering(object):
+    """Move ordering for alpha-beta search.
+
+    The best move remembered for the position (the principal variation
+    move of the previous iteration, as found in the transposition table) is
+    searched first, then the killer moves of the current ply (moves that
+    recently caused a cutoff at the same depth of the tree), then the
+    remaining moves sorted by their history score (how often and how deep
+    each move caused cutoffs anywhere in the tree) or, optionally, by a
+    static mobility score.
+
+    Any object with the same order(), cutoff() and new_search() methods can
+    be passed to `AlphaBetaPlayer` instead.
+
+    Parameters
+    ----------
+    killers : bool (optional)
+        Search the (up to two) killer moves of each ply early.
+
+    history : bool (optional)
+        Sort the remaining moves by their history score.
+
+    mobility : bool (optional)
+        Sort the remaining moves by the mover's mobility after the move
+        minus the opponent's, instead of by history score. This costs one
+        push_move()/pop_move() pair per move.
+    """
+
+    def __init__(self, killers=True, history=True, mobility=False):
+        self.killers = killers
+        self.history = history
+        self.mobility = mobility
+        self._killers = []
+        self._history = {}
+
+    def new_search(self):
+        """Forget the killer moves and age the history scores before the
+        search of a new move.
+        """
+        self._killers = []
+        self._history = {move: score // 2 for move, score in self._history.items() if score > 1}
+
+    def order(self, game, moves, ply, hash_move=None):
+        """Return the legal moves of `game` at the given ply (distance from
+        the root) in the order they should be searched.
+        """
+        first = []
+        if hash_move is not None and hash_move in moves:
+            first.append(hash_move)
+        if self.killers and ply < len(self._killers):
+            for killer in self._killers[ply]:
+                if killer is not None and killer in moves and killer not in first:
+                    first.append(killer)
+        if first:
+            moves = [move for move in moves if move not in first]
+
+        if self.mobility:
+            scores = {}
+            for move in moves:
+                game.push_move(move)
+                scores[move] = (game.legal_move_count(game.inactive_player) -
+                                game.legal_move_count(game.active_player))
+                game.pop_move()
+            moves.sort(key=scores.__getitem__, reverse=True)
+        elif self.history and self._history:
+            history = self._history
+            moves.sort(key=lambda move: history.get(move, 0), reverse=True)
+
+        return first + moves if first else moves
+
+    def cutoff(self, move, ply, depth):
+        """Record that `move` caused a cutoff at the given ply, with `depth`
+        plies left to search below the node.
+        """
+        if self.killers:
+            while len(self._killers) <= ply:
+                self._killers.append([None, None])
+            killers = self._killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
+        if self.history:
+            self._history[move] = self._history.get(move, 0) + depth * depth
 
 
 class IsolationPlayer:
@@ -137,8 +656,18 @@ class MinimaxPlayer(IsolationPlayer):
     """Game-playing agent that chooses a move using depth-limited minimax
     search. You must finish and test this player to make sure it properly uses
     minimax to return a good move before the search time limit expires.
+
+    Attributes
+    ----------
+    stats, last_stats : `SearchStats`
+        The statistics of every call to get_move() and of the last one.
     """
 
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.):
+        super().__init__(search_depth=search_depth, score_fn=score_fn, timeout=timeout)
+        self.stats = SearchStats()
+        self.last_stats = SearchStats()
+
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
         result before the time limit expires.
@@ -169,18 +698,34 @@ class MinimaxPlayer(IsolationPlayer):
         """
         self.time_left = time_left
 
+        # Board.play() hands out a read-only snapshot; search pushes and pops
+        # moves on a private copy instead
+        game = game.copy()
+
         # Initialize the best move so that this function returns something
         # in case the search fails due to timeout
         best_move = (-1, -1)
 
+        stats = self.last_stats = SearchStats()
+        stats.moves = 1
+        start = time.perf_counter()
+        self._clock = None
         try:
             # The try/except block will automatically catch the exception
             # raised when the timer is about to expire.
-            return self.minimax(game, self.search_depth)
+            best_move = self.minimax(game, self.search_depth)
+            stats.depth = self.search_depth
+            stats.iteration_times.append((time.perf_counter() - start) * 1000.)
 
         except SearchTimeout:
             pass  # Handle any actions required after timeout as needed
 
+        finally:
+            if self._clock is not None:
+                stats.nodes = self._clock.count
+            stats.time = (time.perf_counter() - start) * 1000.
+            self.stats.merge(stats)
+
         # Return the best move from the last completed search iteration
         return best_move
 
@@ -205,19 +750,24 @@ class MinimaxPlayer(IsolationPlayer):
         float
             The expected score of the move the move that minimizes the chances of the player `self` winning.
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self._clock.tick()
 
         utility = game.utility(self)
         if utility != 0:
             return utility
 
         if current_depth == max_depth:
+            self.last_stats.leaf_evals += 1
             return self.score(game, self)
 
-        return min([
-            self.maximize(game.forecast_move(move), max_depth, current_depth + 1)
-            for move in game.get_legal_moves()])
+        minimum = float("inf")
+        for move in game.get_legal_moves():
+            game.push_move(move)
+            try:
+                minimum = min(minimum, self.maximize(game, max_depth, current_depth + 1))
+            finally:
+                game.pop_move()
+        return minimum
 
     def maximize(self, game, max_depth, current_depth):
         """ Find the move that maximizes the chances of the player 'self' winning on the given game board.
@@ -240,19 +790,24 @@ class MinimaxPlayer(IsolationPlayer):
         float
             The expected score of the move the move that maximizes the chances of the player `self` winning.
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self._clock.tick()
 
         utility = game.utility(self)
         if utility != 0:
             return utility
 
         if current_depth == max_depth:
+            self.last_stats.leaf_evals += 1
             return self.score(game, self)
 
-        return max([
-            self.minimize(game.forecast_move(move), max_depth, current_depth + 1)
-            for move in game.get_legal_moves()])
+        maximum = float("-inf")
+        for move in game.get_legal_moves():
+            game.push_move(move)
+            try:
+                maximum = max(maximum, self.minimize(game, max_depth, current_depth + 1))
+            finally:
+                game.pop_move()
+        return maximum
 
     def minimax(self, game, depth):
         """Implement depth-limited minimax search algorithm as described in
@@ -295,16 +850,21 @@ class MinimaxPlayer(IsolationPlayer):
         """
         if self.time_left() < self.TIMER_THRESHOLD:
             raise SearchTimeout()
+        self._clock = search_clock(self)
 
         best_move = (-1, -1)
 
-        moves = dict(zip(game.get_legal_moves(),
-                          [self.minimize(game.forecast_move(move), depth, 1) for move in game.get_legal_moves()]))
+        best_score = float("-inf")
+        for move in game.get_legal_moves():
+            game.push_move(move)
+            try:
+                score = self.minimize(game, depth, 1)
+            finally:
+                game.pop_move()
 
-        try:
-            best_move = max(moves, key=lambda k: moves[k])
-        except ValueError:
-            pass
+            if best_move == (-1, -1) or score > best_score:
+                best_move = move
+                best_score = score
 
         return best_move
 
@@ -313,7 +873,87 @@ class AlphaBetaPlayer(IsolationPlayer):
     """Game-playing agent that chooses a move using iterative deepening minimax
     search with alpha-beta pruning. You must finish and test this player to
     make sure it returns a good move before the search time limit expires.
+
+    Parameters
+    ----------
+    search_depth, score_fn, timeout
+        See `IsolationPlayer`.
+
+    symmetry : bool (optional)
+        If True, moves that lead to symmetric positions (under a rotation or
+        reflection of the board) are searched only once at every node whose
+        position is itself symmetric, e.g. the opening placement moves.
+
+    tt_size : int (optional)
+        The number of entries of the transposition table that remembers
+        search results between iterations and between moves of the same
+        game; 0 disables the table.
+
+    tt_replacement : str (optional)
+        The replacement policy of the transposition table (see
+        `TranspositionTable`).
+
+    move_ordering : `MoveOrdering` (optional)
+        The move ordering used at every node; by default a `MoveOrdering`
+        with killer moves and history scores. If None, only the best move
+        from the transposition table is moved to the front.
+
+    pvs : bool (optional)
+        If True, use Principal Variation Search: only the first move of
+        every node is searched with the full window; the others are searched
+        with a null window around alpha (beta at minimizing nodes) and only
+        re-searched with the full window when they turn out to be better.
+
+    aspiration : float (optional)
+        If given, every iterative deepening iteration after the first starts
+        with the window (v - aspiration, v + aspiration) around the value v
+        of the previous iteration, and is searched again with the failing
+        side of the window opened if the result falls outside.
+
+    endgame : `isolation.endgame.EndgameSolver` (optional)
+        The solver used once the players are separated: get_move() plays the
+        solver's move when the root position is partitioned, and the search
+        scores partitioned positions with at most ENDGAME_CELLS empty cells
+        exactly. By default a new solver; if None, partitioned positions are
+        searched like any other.
+
+    book : str or `isolation.OpeningBook` (optional)
+        An opening book (or the path of a book file written by
+        opening_book.py); get_move() plays the book move without searching
+        whenever the position is in the book.
+
+    time_manager : `TimeManager` (optional)
+        Decides whether to start each iterative deepening iteration and sets
+        the time left at which the search is aborted; by default a
+        `TimeManager` whose margin starts at, and never drops below,
+        `timeout`. If None, get_move() deepens until the time left drops
+        below `timeout`.
     """
+    # Width of the null windows searched by PVS
+    NULL_WINDOW = 1e-6
+
+    # Largest number of empty cells for which search nodes are tested for a
+    # partition and solved exactly
+    ENDGAME_CELLS = 20
+
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.,
+                 symmetry=False, tt_size=1 << 16, tt_replacement="depth",
+                 move_ordering=DEFAULT, pvs=False, aspiration=None, endgame=DEFAULT,
+                 book=None, time_manager=DEFAULT):
+        super().__init__(search_depth=search_depth, score_fn=score_fn, timeout=timeout)
+        self.symmetry = symmetry
+        self.tt = TranspositionTable(tt_size, tt_replacement) if tt_size else None
+        self.move_ordering = MoveOrdering() if move_ordering is DEFAULT else move_ordering
+        self.endgame = EndgameSolver() if endgame is DEFAULT else endgame
+        self.book = OpeningBook(book) if isinstance(book, str) else book
+        self.time_manager = TimeManager(timeout) if time_manager is DEFAULT else time_manager
+        self.pvs = pvs
+        self.stats = SearchStats()
+        self.last_stats = SearchStats()
+        self.aspiration = aspiration
+        self._tt_context = None
+        self._root_move = None
+        self._root_value = None
 
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
@@ -347,28 +987,163 @@ class AlphaBetaPlayer(IsolationPlayer):
         """
         self.time_left = time_left
 
+        # Board.play() hands out a read-only snapshot; search pushes and pops
+        # moves on a private copy instead
+        game = game.copy()
+
+        stats = self.last_stats = SearchStats()
+        stats.moves = 1
+        start = time.perf_counter()
+        try:
+            self.start_search(game)
+
+            if self.book is not None:
+                move = self.book.lookup(game)
+                if move is not None and move in game.get_legal_moves():
+                    return move
+
+            move = self.solve_endgame(game)
+            if move is not None:
+                return move
+
+            return self.iterative_deepening(game)
+        finally:
+            stats.time = (time.perf_counter() - start) * 1000.
+            self.stats.merge(stats)
+            if self.time_manager is not None:
+                self.time_manager.end_turn(getattr(self, "_clock", None))
+
+    def iterative_deepening(self, game):
+        """Search the root to increasing depths until the time manager stops
+        the search or the time runs out, and return the best move of the
+        deepest completed iteration.
+        """
         # Initialize the best move so that this function returns something
         # in case the search fails due to timeout
         best_move = (-1, -1)
 
+        stats = self.last_stats
+        manager = self.time_manager
+        self._clock = search_clock(self)
+        nodes = self._clock.count
+        if manager is not None:
+            manager.new_turn(self.time_left, nodes)
+
         try:
             # The try/except block will automatically catch the exception
             # raised when the timer is about to expire.
             depth = 1
             while True:
+                start = time.perf_counter()
                 new_move = self.alphabeta(game, depth)
                 if new_move == (-1, -1):
-                    return best_move
+                    break
 
                 best_move = new_move
+                stats.depth = depth
+                stats.iteration_times.append((time.perf_counter() - start) * 1000.)
+                if manager is not None:
+                    manager.iteration_done(depth, self._clock.count, best_move, self._root_value)
+                    if not manager.should_continue():
+                        break
                 depth += 1
 
         except SearchTimeout:
             pass  # Handle any actions required after timeout as needed
 
+        finally:
+            stats.nodes += self._clock.count - nodes
+
         # Return the best move from the last completed search iteration
         return best_move
 
+    def start_search(self, game):
+        """Prepare the transposition table and move ordering for a new call
+        to get_move().
+
+        Entries are kept between the moves of one game, but the table is
+        cleared when a new game starts (the move count goes down) or when
+        this player changes sides, because the stored scores are relative to
+        this player.
+        """
+        self._root_move = None
+        self._root_value = None
+        if self.move_ordering is not None:
+            self.move_ordering.new_search()
+        if self.tt is None:
+            return
+        is_player_1 = (game.active_player == self) == (game.move_count % 2 == 0)
+        context = self._tt_context
+        if context is None or game.move_count <= context[0] or is_player_1 != context[1]:
+            self.tt.clear()
+        self._tt_context = (game.move_count, is_player_1)
+        self.tt.new_search()
+
+    def solve_endgame(self, game):
+        """Return the exact best move of a partitioned root position, or None
+        if the players are not separated, if this player has no legal moves,
+        or if the solver does not finish within half of the time left.
+        """
+        if self.endgame is None or not game.is_partitioned():
+            return None
+        budget = self.time_left() / 2.
+        clock = SearchClock(lambda: self.time_left() - budget, self.TIMER_THRESHOLD)
+        try:
+            _, move, _, _ = self.endgame.solve(game, clock.tick)
+        except SearchTimeout:
+            return None
+        finally:
+            self.last_stats.nodes += clock.count
+        return move
+
+    def endgame_value(self, game):
+        """Return the exact value (+inf or -inf for this player) of a
+        partitioned position with at most ENDGAME_CELLS empty cells, or None
+        for any other position.
+        """
+        if self.endgame is None or game.width * game.height - game.move_count > self.ENDGAME_CELLS:
+            return None
+        result = self.endgame.solve(game, self._clock.tick)
+        if result is None:
+            return None
+        if result[0] == (game.active_player == self):
+            return float("inf")
+        return float("-inf")
+
+    def legal_moves(self, game, hash_move=None, ply=0):
+        """Return the moves to search from the current position of `game` in
+        search order, with symmetric duplicates removed when symmetry
+        folding is enabled.
+
+        Parameters
+        ----------
+        game : isolation.Board
+            The current position.
+
+        hash_move : (int, int) (optional)
+            The best move previously found for this position, if any.
+
+        ply : int (optional)
+            The distance of the position from the root of the search.
+        """
+        moves = game.get_legal_moves()
+        if self.move_ordering is not None:
+            moves = self.move_ordering.order(game, moves, ply, hash_move)
+        elif hash_move is not None and hash_move in moves:
+            moves.remove(hash_move)
+            moves.insert(0, hash_move)
+        if self.symmetry:
+            symmetries = game.symmetries()
+            if symmetries:
+                seen = set()
+                unique = []
+                for move in moves:
+                    if move not in seen:
+                        unique.append(move)
+                        seen.update(game.transform_move(move, t) for t in symmetries)
+                return unique
+        return moves
+
     def minimize(self, game, max_depth, current_depth, alpha, beta):
         """ Find the move that minimizes the chances of the player 'self' winning on the given game board.
         If the time is up, raises an exception and stops the current search.
@@ -396,31 +1171,68 @@ class AlphaBetaPlayer(IsolationPlayer):
         float
             The expected score of the move the move that minimizes the chances of the player `self` winning.
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self._clock.tick()
 
         utility = game.utility(self)
         if utility != 0:
             return utility
 
+        exact = self.endgame_value(game)
+        if exact is not None:
+            return exact
+
+        stats = self.last_stats
         if current_depth == max_depth:
+            stats.leaf_evals += 1
             return self.score(game, self)
 
+        tt = self.tt
+        hash_move = None
+        if tt is not None:
+            key = game.zobrist_key
+            entry = tt.probe(key)
+            stats.tt_probes += 1
+            if entry is not None:
+                stats.tt_hits += 1
+                if entry[1] >= max_depth - current_depth and tt_cutoff(entry, alpha, beta):
+                    return entry[3]
+                hash_move = entry[4]
+        alpha_orig, beta_orig = alpha, beta
+
         minimum = float("inf")
-        for move in game.get_legal_moves():
-            minimum = min(minimum,
-                          self.maximize(game.forecast_move(move),
-                                        max_depth,
-                                        current_depth + 1,
-                                        alpha,
-                                        beta
-                                        )
-                          )
+        best_move = None
+        for index, move in enumerate(self.legal_moves(game, hash_move, current_depth)):
+            game.push_move(move)
+            try:
+                if self.pvs and best_move is not None and beta != float("inf"):
+                    result = self.maximize(game, max_depth, current_depth + 1,
+                                           beta - self.NULL_WINDOW, beta)
+                    if alpha < result < beta:
+                        result = self.maximize(game, max_depth, current_depth + 1, alpha, beta)
+                else:
+                    result = self.maximize(game,
+                                           max_depth,
+                                           current_depth + 1,
+                                           alpha,
+                                           beta
+                                           )
+            finally:
+                game.pop_move()
+
+            if best_move is None or result < minimum:
+                best_move = move
+                minimum = result
 
             if minimum <= alpha:
-                return minimum
+                stats.cutoff(index)
+                if self.move_ordering is not None:
+                    self.move_ordering.cutoff(move, current_depth, max_depth - current_depth)
+                break
             beta = min(minimum, beta)
 
+        if tt is not None:
+            tt.store(key, max_depth - current_depth, bound_type(minimum, alpha_orig, beta_orig),
+                     minimum, best_move)
         return minimum
 
     def maximize(self, game, max_depth, current_depth, alpha, beta):
@@ -450,42 +1262,128 @@ class AlphaBetaPlayer(IsolationPlayer):
         float
             The expected score of the move the move that maximizes the chances of the player `self` winning.
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self._clock.tick()
 
         utility = game.utility(self)
         if utility != 0:
             return utility
 
+        exact = self.endgame_value(game)
+        if exact is not None:
+            return exact
+
+        stats = self.last_stats
         if current_depth == max_depth:
+            stats.leaf_evals += 1
             return self.score(game, self)
 
+        tt = self.tt
+        hash_move = None
+        if tt is not None:
+            key = game.zobrist_key
+            entry = tt.probe(key)
+            stats.tt_probes += 1
+            if entry is not None:
+                stats.tt_hits += 1
+                if entry[1] >= max_depth - current_depth and tt_cutoff(entry, alpha, beta):
+                    return entry[3]
+                hash_move = entry[4]
+        alpha_orig, beta_orig = alpha, beta
+
         maximum = float("-inf")
+        best_move = None
+
+        for index, move in enumerate(self.legal_moves(game, hash_move, current_depth)):
+            game.push_move(move)
+            try:
+                if self.pvs and best_move is not None and alpha != float("-inf"):
+                    result = self.minimize(game, max_depth, current_depth + 1,
+                                           alpha, alpha + self.NULL_WINDOW)
+                    if alpha < result < beta:
+                        result = self.minimize(game, max_depth, current_depth + 1, alpha, beta)
+                else:
+                    result = self.minimize(game,
+                                           max_depth,
+                                           current_depth + 1,
+                                           alpha,
+                                           beta
+                                           )
+            finally:
+                game.pop_move()
+
+            if best_move is None or result > maximum:
+                best_move = move
+                maximum = result
+
+            if maximum >= beta:
+                stats.cutoff(index)
+                if self.move_ordering is not None:
+                    self.move_ordering.cutoff(move, current_depth, max_depth - current_depth)
+                break
+            alpha = max(maximum, alpha)
+
+        if tt is not None:
+            tt.store(key, max_depth - current_depth, bound_type(maximum, alpha_orig, beta_orig),
+                     maximum, best_move)
+        return maximum
+
+    def search_root(self, game, depth, alpha=float("-inf"), beta=float("inf")):
+        """Search every move available at the root to the given depth.
+
+        Parameters
+        ----------
+        game : isolation.Board
+            The root position, with this player to move.
+
+        depth : int
+            The number of plies to search.
+
+        alpha, beta : float
+            The search window.
+
+        Returns
+        -------
+        ((int, int), float)
+            The best move and its value; ((-1, -1), -inf) if there are no
+            legal moves. If every move loses, the first one is returned.
+        """
         best_move = (-1, -1)
+        maximum = float("-inf")
+        alpha_orig, beta_orig = alpha, beta
+
+        # The best root move of the previous iteration comes first
+        hash_move = self._root_move
+        if self.tt is not None:
+            entry = self.tt.probe(game.zobrist_key)
+            if entry is not None:
+                hash_move = entry[4]
+
+        for move in self.legal_moves(game, hash_move):
+            game.push_move(move)
+            try:
+                if self.pvs and best_move != (-1, -1) and alpha != float("-inf"):
+                    result = self.minimize(game, depth, 1, alpha, alpha + self.NULL_WINDOW)
+                    if alpha < result < beta:
+                        result = self.minimize(game, depth, 1, alpha, beta)
+                else:
+                    result = self.minimize(game, depth, 1, alpha, beta)
+            finally:
+                game.pop_move()
 
-        for move in game.get_legal_moves():
-            result = self.minimize(game.forecast_move(move),
-                                   max_depth,
-                                   current_depth + 1,
-                                   alpha,
-                                   beta
-                                   )
-
-            if result > maximum:
+            if best_move == (-1, -1) or result > maximum:
                 best_move = move
                 maximum = result
 
             if maximum >= beta:
-                if current_depth == 0:
-                    return best_move
-                else:
-                    return maximum
+                break
             alpha = max(maximum, alpha)
 
-        if current_depth == 0:
-            return best_move
-        else:
-            return maximum
+        if best_move != (-1, -1):
+            self._root_move = best_move
+            if self.tt is not None:
+                self.tt.store(game.zobrist_key, depth, bound_type(maximum, alpha_orig, beta_orig),
+                              maximum, best_move)
+        return best_move, maximum
 
     def alphabeta(self, game, depth, alpha=float("-inf"), beta=float("inf")):
         """Implement depth-limited minimax search with alpha-beta pruning as
@@ -532,14 +1430,327 @@ class AlphaBetaPlayer(IsolationPlayer):
                 each helper function or else your agent will timeout during
                 testing.
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
+        self._clock = search_clock(self)
+        if self.time_left() < self._clock.threshold:
             raise SearchTimeout()
 
         best_move = (-1, -1)
 
         try:
-            best_move = self.maximize(game, depth, 0, alpha, beta)
+            if (self.aspiration is not None and alpha == float("-inf") and beta == float("inf") and
+                    self._root_value is not None and abs(self._root_value) != float("inf")):
+                best_move, value = self.aspiration_search(game, depth, self._root_value)
+            else:
+                best_move, value = self.search_root(game, depth, alpha, beta)
+            self._root_value = value
         except SearchTimeout:
             pass
 
         return best_move
+
+    def aspiration_search(self, game, depth, guess):
+        """Search the root with an aspiration window centred on `guess`,
+        opening the failing side of the window until the result is exact.
+
+        Returns
+        -------
+        ((int, int), float)
+            The best move and its value, as for search_root().
+        """
+        alpha, beta = guess - self.aspiration, guess + self.aspiration
+        while True:
+            best_move, value = self.search_root(game, depth, alpha, beta)
+            if value <= alpha and alpha != float("-inf"):
+                alpha = float("-inf")
+            elif value >= beta and beta != float("inf"):
+                beta = float("inf")
+            else:
+                return best_move, value
+
+
+class MTDfPlayer(AlphaBetaPlayer):
+    """Game-playing agent that chooses a move using iterative deepening and
+    MTD(f): every iteration converges on the minimax value through a series
+    of zero-window alpha-beta searches centred on the value of the previous
+    iteration, relying on the transposition table to avoid searching the
+    same positions again in each pass.
+
+    Parameters
+    ----------
+    search_depth, score_fn, timeout, symmetry, tt_size, tt_replacement, move_ordering
+        See `AlphaBetaPlayer`. The transposition table is required.
+
+    step : float (optional)
+        The granularity of the evaluation function: each pass searches the
+        window (beta - step, beta). Values that fall strictly inside the
+        window are exact, so a step coarser than the scores is still correct
+        but needs fewer passes (custom_score and improved_score return
+        multiples of 0.5 and 1 respectively).
+
+    **kwargs
+        Any other option of `AlphaBetaPlayer` (pvs, endgame, book,
+        time_manager). `aspiration` is rejected: every MTD(f) pass already
+        searches a zero-width window around the previous value.
+
+    Attributes
+    ----------
+    passes : int
+        The number of zero-window searches made by the last call to
+        get_move().
+    """
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.,
+                 symmetry=False, tt_size=1 << 16, tt_replacement="depth",
+                 move_ordering=DEFAULT, step=0.5, **kwargs):
+        if not tt_size:
+            raise ValueError("MTD(f) requires a transposition table.")
+        if kwargs.get("aspiration") is not None:
+            raise ValueError("MTD(f) does not use aspiration windows.")
+        super().__init__(search_depth=search_depth, score_fn=score_fn, timeout=timeout,
+                         symmetry=symmetry, tt_size=tt_size, tt_replacement=tt_replacement,
+                         move_ordering=move_ordering, **kwargs)
+        self.step = step
+        self.passes = 0
+
+    def start_search(self, game):
+        super().start_search(game)
+        self.passes = 0
+
+    def alphabeta(self, game, depth, alpha=float("-inf"), beta=float("inf")):
+        """Search the root to the given depth with MTD(f), using the value of
+        the previous iteration (or 0) as the first guess.
+
+        Returns
+        -------
+        (int, int)
+            The best move found; (-1, -1) if there are no legal moves or the
+            search timed out.
+        """
+        self._clock = search_clock(self)
+        if self.time_left() < self._clock.threshold:
+            raise SearchTimeout()
+
+        guess = self._root_value
+        if guess is None or abs(guess) == float("inf"):
+            guess = 0.
+
+        best_move = (-1, -1)
+
+        try:
+            best_move, self._root_value = self.mtdf(game, depth, guess)
+        except SearchTimeout:
+            best_move = (-1, -1)
+
+        return best_move
+
+    def mtdf(self, game, depth, guess):
+        """Converge on the value of the root through zero-window searches.
+
+        Returns
+        -------
+        ((int, int), float)
+            The best move and its value, as for search_root().
+        """
+        lower, upper = float("-inf"), float("inf")
+        value = guess
+        best_move = None
+        while lower < upper:
+            beta = max(value, lower + self.step)
+            move, value = self.search_root(game, depth, beta - self.step, beta)
+            self.passes += 1
+            if value <= beta - self.step:
+                upper = value
+            elif value >= beta:
+                lower = value
+                best_move = move
+            else:
+                lower = upper = value
+                best_move = move
+            if best_move is None and upper == float("-inf"):
+                # Every move loses
+                best_move = move
+
+        return best_move, value
+
+
+class MCTSNode(object):
+    """A node of the `MCTSPlayer` search tree.
+
+    Attributes
+    ----------
+    move : (int, int)
+        The move that leads from the parent to this node (None at the root).
+
+    key : int
+        The Zobrist key of the position at this node.
+
+    children : list<MCTSNode>
+        The expanded children.
+
+    untried : list<(int, int)>
+        The legal moves that have no child node yet.
+
+    visits : int
+        The number of playouts through this node.
+
+    wins : int
+        The number of those playouts won by the player who made `move`.
+    """
+    __slots__ = ("move", "key", "children", "untried", "visits", "wins")
+
+    def __init__(self, move, key, untried):
+        self.move = move
+        self.key = key
+        self.children = []
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0
+
+    def select(self, exploration):
+        """Return the child with the highest UCT score."""
+        log_visits = math.log(self.visits)
+        best, best_score = None, float("-inf")
+        for child in self.children:
+            score = child.wins / child.visits + exploration * math.sqrt(log_visits / child.visits)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+
+class MCTSPlayer(IsolationPlayer):
+    """Game-playing agent that chooses a move with Monte Carlo Tree Search
+    (UCT) and random playouts until the time limit.
+
+    The subtree below the move actually played is kept between calls to
+    get_move(), so the playouts spent on the opponent's reply are reused.
+
+    Parameters
+    ----------
+    timeout : float (optional)
+        Time remaining (in milliseconds) when search is aborted.
+
+    exploration : float (optional)
+        The UCT exploration constant.
+
+    seed : int (optional)
+        Seed of the random number generator used for the playouts.
+
+    Attributes
+    ----------
+    playouts : int
+        The number of playouts made by the last call to get_move().
+
+    playouts_per_second : float
+        The playout rate of the last call to get_move().
+
+    total_playouts, total_time : int, float
+        The number of playouts and the time (in seconds) spent in
+        get_move() since the player was created.
+    """
+    def __init__(self, timeout=10., exploration=math.sqrt(2), seed=None):
+        super().__init__(timeout=timeout)
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.playouts = 0
+        self.playouts_per_second = 0.
+        self.total_playouts = 0
+        self.total_time = 0.
+        self._tree = None
+        self._discarded = None
+
+    def get_move(self, game, time_left):
+        """Search for the best move until the time limit expires.
+
+        Parameters
+        ----------
+        game : `isolation.Board`
+            An instance of `isolation.Board` encoding the current state of the
+            game (e.g., player locations and blocked cells).
+
+        time_left : callable
+            A function that returns the number of milliseconds left in the
+            current turn. Returning with any less than 0 ms remaining forfeits
+            the game.
+
+        Returns
+        -------
+        (int, int)
+            The move whose node received the most playouts; (-1, -1) if there
+            are no available legal moves.
+        """
+        self.time_left = time_left
+        start = time.perf_counter()
+        game = game.copy()
+
+        # Free the branches dropped by the previous call now, while the
+        # time limit is still far away
+        self._discarded = None
+
+        root = self.reuse_tree(game)
+        if not root.children and not root.untried:
+            self._tree = None
+            return (-1, -1)
+
+        playouts = 0
+        while self.time_left() > self.TIMER_THRESHOLD:
+            self.playout(game, root)
+            playouts += 1
+
+        elapsed = time.perf_counter() - start
+        self.playouts = playouts
+        self.playouts_per_second = playouts / elapsed if elapsed > 0 else 0.
+        self.total_playouts += playouts
+        self.total_time += elapsed
+
+        if not root.children:
+            # Not even one playout finished: play any legal move
+            self._tree = None
+            return root.untried[-1]
+        best = max(root.children, key=lambda child: child.visits)
+        self._tree = best
+        self._discarded = root
+        return best.move
+
+    def reuse_tree(self, game):
+        """Return the root node for the position of `game`: the node below the
+        previous move of this player that matches the opponent's reply if
+        there is one, otherwise a new node.
+        """
+        key = game.zobrist_key
+        tree = self._tree
+        if tree is not None:
+            if tree.key == key:
+                return tree
+            for child in tree.children:
+                if child.key == key:
+                    return child
+        return MCTSNode(None, key, game.get_legal_moves())
+
+    def playout(self, game, root):
+        """Run one iteration of UCT from `root` (the position of `game`):
+        select a path with UCT, expand one new node, play a random game from
+        it and update the statistics along the path.
+        """
+        node = root
+        path = [root]
+        while not node.untried and node.children:
+            node = node.select(self.exploration)
+            game.push_move(node.move)
+            path.append(node)
+        if node.untried:
+            move = node.untried.pop()
+            game.push_move(move)
+            node = MCTSNode(move, game.zobrist_key, game.get_legal_moves())
+            path[-1].children.append(node)
+            path.append(node)
+
+        # The player who moved into the last node is the inactive player
+        mover_won = game.random_playout(self.rng) == game.inactive_player
+
+        for node in reversed(path):
+            node.visits += 1
+            if mover_won:
+                node.wins += 1
+            mover_won = not mover_won
+
+        for _ in range(len(path) - 1):
+            game.pop_move()
@@ -8,4 +8,12 @@ legal moves loses, and the opponent is declared the winner.
 """
 
 # Make the Board class available at the root of the module for imports
-from .isolation import Board
+from .isolation import Board, BoardSnapshot, Deadline, MoveLog, MoveRecord
+from .endgame import EndgameSolver
+from .book import OpeningBook
+
+# BoardBatch needs NumPy, which the Board class itself does not
+try:
+    from .batch import BoardBatch
+except ImportError:
+    pass
@@ -0,0 +1,183 @@
+"""
+This file contains the `BoardBatch` class, which stores many games of
+Isolation as NumPy arrays so that move generation, move application and
+simple evaluations run over the whole batch at once.
+
+Cells are indexed exactly as in `isolation.Board`: ``idx = row + column *
+height``. A player location of -1 means the player has not been placed yet.
+"""
+import numpy as np
+
+from .isolation import Board, _geometry
+
+
+class BoardBatch(object):
+    """A batch of N isolation games of the same size, stored as arrays.
+
+    Parameters
+    ----------
+    size : int
+        The number of games in the batch. All games start from the empty
+        board with player 1 to move.
+
+    width : int (optional)
+        The number of columns of every board in the batch.
+
+    height : int (optional)
+        The number of rows of every board in the batch.
+
+    Attributes
+    ----------
+    occupied : numpy.ndarray, shape (N, width * height), dtype bool
+        True for every cell that has been visited in each game.
+
+    locations : numpy.ndarray, shape (N, 2), dtype int
+        The cell index of player 1 and player 2 in each game, or -1 if the
+        player has not moved yet.
+
+    move_count : numpy.ndarray, shape (N,), dtype int
+        The number of moves applied to each game. Player 1 is to move in
+        games with an even move count.
+
+    players : list<(object, object)>
+        The (player_1, player_2) objects of each game, used to rebuild
+        `Board` objects in to_boards().
+    """
+
+    def __init__(self, size, width=7, height=7):
+        self.width = width
+        self.height = height
+        cells = width * height
+        self.occupied = np.zeros((size, cells), dtype=bool)
+        self.locations = np.full((size, 2), -1, dtype=np.int64)
+        self.move_count = np.zeros(size, dtype=np.int64)
+        self.players = [(None, None)] * size
+
+        # adjacency[i, j] is True if a knight can jump from cell i to cell j
+        masks = _geometry(width, height).knight_masks
+        self._adjacency = np.array([[bool(mask >> j & 1) for j in range(cells)]
+                                    for mask in masks], dtype=bool)
+
+    def __len__(self):
+        return len(self.move_count)
+
+    @classmethod
+    def from_boards(cls, boards):
+        """Build a batch holding the game state of each `isolation.Board`.
+
+        Parameters
+        ----------
+        boards : sequence<isolation.Board>
+            The boards to convert; they must all have the same dimensions.
+
+        Returns
+        -------
+        BoardBatch
+        """
+        boards = list(boards)
+        if not boards:
+            raise ValueError("Cannot build a BoardBatch from an empty sequence of boards.")
+        width, height = boards[0].width, boards[0].height
+        if any(b.width != width or b.height != height for b in boards):
+            raise ValueError("All boards in a BoardBatch must have the same dimensions.")
+
+        batch = cls(len(boards), width, height)
+        cells = width * height
+        nbytes = (cells + 7) // 8
+        packed = np.frombuffer(b"".join(b._occupied.to_bytes(nbytes, "little") for b in boards),
+                               dtype=np.uint8).reshape(len(boards), nbytes)
+        batch.occupied[:] = np.unpackbits(packed, axis=1, bitorder="little")[:, :cells]
+        batch.locations[:] = [[-1 if b._loc1 is None else b._loc1,
+                               -1 if b._loc2 is None else b._loc2] for b in boards]
+        batch.move_count[:] = [b.move_count for b in boards]
+        batch.players = [(b._player_1, b._player_2) for b in boards]
+        return batch
+
+    def to_boards(self, player_1=None, player_2=None):
+        """Rebuild one `isolation.Board` per game in the batch.
+
+        Parameters
+        ----------
+        player_1, player_2 : object (optional)
+            Player objects to use for games that were not created from a
+            `Board` (i.e., whose entry in `players` is (None, None)).
+
+        Returns
+        -------
+        list<isolation.Board>
+        """
+        cells = self.width * self.height
+        packed = np.packbits(self.occupied, axis=1, bitorder="little")
+        boards = []
+        for i in range(len(self)):
+            p1, p2 = self.players[i]
+            if p1 is None and p2 is None:
+                p1, p2 = player_1, player_2
+            board = Board(p1, p2, self.width, self.height)
+            loc1, loc2 = (int(loc) for loc in self.locations[i])
+            occupied = int.from_bytes(packed[i].tobytes(), "little") & ((1 << cells) - 1)
+            board._set_state(occupied,
+                             None if loc1 < 0 else loc1,
+                             None if loc2 < 0 else loc2,
+                             int(self.move_count[i]))
+            boards.append(board)
+        return boards
+
+    def active_slot(self):
+        """Return the index (0 for player 1, 1 for player 2) of the player to
+        move in each game.
+        """
+        return self.move_count & 1
+
+    def legal_move_mask(self, slot=None):
+        """Return a boolean (N, width * height) array marking the legal moves
+        of one player in every game.
+
+        Parameters
+        ----------
+        slot : int or numpy.ndarray (optional)
+            0 for player 1 or 1 for player 2, either for all games or per
+            game. If None, use the player to move in each game.
+        """
+        if slot is None:
+            slot = self.active_slot()
+        rows = np.arange(len(self))
+        locations = self.locations[rows, slot]
+        moved = locations >= 0
+        mask = ~self.occupied
+        mask[moved] &= self._adjacency[locations[moved]]
+        return mask
+
+    def apply_moves(self, moves, where=None):
+        """Move the active player of each game in-place.
+
+        Parameters
+        ----------
+        moves : numpy.ndarray
+            Either N cell indices or N (row, column) pairs. Moves are not
+            checked for legality, exactly like `Board.apply_move`.
+
+        where : numpy.ndarray (optional)
+            A boolean mask of length N selecting the games to advance; the
+            other games (and their entries in `moves`) are left untouched.
+        """
+        moves = np.asarray(moves, dtype=np.int64)
+        if moves.ndim == 2:
+            moves = moves[:, 0] + moves[:, 1] * self.height
+        rows = np.arange(len(self)) if where is None else np.flatnonzero(where)
+        moves = moves[rows]
+        self.occupied[rows, moves] = True
+        self.locations[rows, self.move_count[rows] & 1] = moves
+        self.move_count[rows] += 1
+
+    def mobility(self, slot=None):
+        """Return the number of legal moves of one player in every game (see
+        legal_move_mask() for the meaning of `slot`).
+        """
+        return self.legal_move_mask(slot).sum(axis=1)
+
+    def is_terminal(self):
+        """Return a boolean array that is True for every game in which the
+        player to move has no legal moves left.
+        """
+        return ~self.legal_move_mask().any(axis=1)
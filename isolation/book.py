@@ -0,0 +1,118 @@
+"""
+This file contains the `OpeningBook` class, which looks up precomputed
+opening moves in a book file (see opening_book.py for the generator).
+
+Positions are stored under their canonical key (`Board.canonical_key()`),
+so all symmetric images of a position share one record, and moves are
+stored in the canonical frame. The file is a header followed by fixed-size
+records sorted by key; `OpeningBook` maps it into memory with `mmap` on
+first use and finds records by binary search, so loading costs nothing
+until the first lookup and only the pages that are touched are read.
+"""
+import mmap
+import struct
+
+# File header: magic, board width, board height, number of records
+_HEADER = struct.Struct("<8sBBI")
+_MAGIC = b"ISOBOOK1"
+
+# One record: canonical position key, and the row and column of the best
+# move in the canonical frame
+_RECORD = struct.Struct("<QBB")
+
+
+def write_book(path, width, height, entries):
+    """Write a book file.
+
+    Parameters
+    ----------
+    path : str
+        The output file.
+
+    width, height : int
+        The board dimensions the book is for.
+
+    entries : iterable<(int, (int, int))>
+        (canonical key, canonical move) pairs, in any order.
+
+    Returns
+    -------
+    int
+        The number of records written.
+    """
+    records = [_RECORD.pack(key, row, col) for key, (row, col) in sorted(entries)]
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, width, height, len(records)))
+        f.writelines(records)
+    return len(records)
+
+
+class OpeningBook(object):
+    """A read-only opening book file written by `generate_book()`.
+
+    Parameters
+    ----------
+    path : str
+        The path of the book file. The file is not opened until the first
+        call to lookup().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.width = None
+        self.height = None
+        self._map = None
+        self._count = 0
+
+    def __len__(self):
+        self._load()
+        return self._count
+
+    def _load(self):
+        if self._map is not None:
+            return
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.width, self.height, self._count = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError("{} is not an opening book file.".format(self.path))
+        if len(self._map) != _HEADER.size + self._count * _RECORD.size:
+            self.close()
+            raise ValueError("Opening book file {} is truncated.".format(self.path))
+
+    def close(self):
+        """Unmap the book file; it is mapped again by the next lookup()."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def find(self, key):
+        """Return the canonical (row, column) move stored for a canonical
+        position key, or None.
+        """
+        self._load()
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            record_key, row, col = _RECORD.unpack_from(self._map, _HEADER.size + mid * _RECORD.size)
+            if record_key < key:
+                lo = mid + 1
+            elif record_key > key:
+                hi = mid
+            else:
+                return row, col
+        return None
+
+    def lookup(self, game):
+        """Return the book move for the current position of `game`, or None
+        if the position is not in the book.
+        """
+        self._load()
+        if (game.width, game.height) != (self.width, self.height):
+            return None
+        key, transform = game.canonical_key()
+        move = self.find(key)
+        if move is None:
+            return None
+        return game.transform_move(move, transform, inverse=True)
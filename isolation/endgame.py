@@ -0,0 +1,169 @@
+"""
+This file contains the `EndgameSolver` class, which plays partitioned
+positions of Isolation exactly.
+
+Once no empty cell is reachable by both players (see
+`Board.is_partitioned`), the moves of one player can no longer affect the
+other, and the game reduces to two independent longest-path problems: each
+player will make exactly as many more moves as the longest knight path
+through the cells they can reach. The player to move runs out of moves
+first unless their path is strictly longer, so the player to move wins if
+and only if L_active > L_inactive.
+"""
+from .isolation import Board, _popcount
+
+
+class EndgameSolver(object):
+    """A memoized longest knight path solver for partitioned positions.
+
+    The longest path from a cell is found by depth-first search over the
+    cells reachable from it. Every search node is cached by (cell, region),
+    where region is the bitmask of the cells still reachable from the cell,
+    and the children of a node are abandoned as soon as one of them reaches
+    a colour-count upper bound on the path length: a knight alternates
+    between light and dark cells, so a path can be at most about twice as
+    long as the number of reachable cells of the rarer colour.
+
+    Parameters
+    ----------
+    max_entries : int (optional)
+        The cache is emptied when it holds more than this many entries.
+    """
+
+    def __init__(self, max_entries=1 << 20):
+        self.max_entries = max_entries
+        self._caches = {}
+
+    def __len__(self):
+        return sum(len(cache) for cache in self._caches.values())
+
+    def clear(self):
+        """Empty the cache."""
+        self._caches = {}
+
+    @staticmethod
+    def upper_bound(geometry, loc, region):
+        """Return an upper bound on the length of any knight path that
+        starts on cell `loc` and visits only cells of the bitmask `region`.
+        """
+        light = _popcount(region & geometry.light_mask)
+        size = _popcount(region)
+        dark = size - light
+        if geometry.light_mask >> loc & 1:
+            same, other = light, dark
+        else:
+            same, other = dark, light
+        # The path alternates colours, starting with the other colour
+        bound = 2 * min(same, other) + (other > same)
+
+        # A cell with at most one neighbour can only be the end of the path
+        knight_masks = geometry.knight_masks
+        cells = region | 1 << loc
+        dead_ends = 0
+        mask = region
+        while mask:
+            low = mask & -mask
+            mask ^= low
+            neighbours = knight_masks[low.bit_length() - 1] & cells
+            if not neighbours & (neighbours - 1):
+                dead_ends += 1
+        if dead_ends > 1:
+            bound = min(bound, size - dead_ends + 1)
+        return bound
+
+    def longest_path(self, board, player=None, tick=None):
+        """Return the length of the longest knight path available to a player
+        (by default, the active player) through the cells they can reach,
+        and the first move of such a path.
+
+        Parameters
+        ----------
+        board : isolation.Board
+            The position; the player must have been placed.
+
+        player : object (optional)
+            A player registered on the board.
+
+        tick : callable (optional)
+            Called once for every search node that is not in the cache,
+            e.g. to check for a timeout by raising an exception.
+
+        Returns
+        -------
+        (int, (int, int))
+            The path length and its first move; (0, None) if the player has
+            no legal moves.
+        """
+        loc = board._location(player)
+        if loc is Board.NOT_MOVED:
+            raise ValueError("The longest path of a player who has not moved is undefined.")
+        geometry = board._geometry
+        region = board.reachable(player)
+        bound = self.upper_bound(geometry, loc, region)
+        best, best_move = 0, None
+        for idx, subregion in self._children(geometry, loc, region):
+            length = 1 + self._longest(geometry, idx, subregion, tick)
+            if length > best:
+                best, best_move = length, geometry.coords[idx]
+                if best >= bound:
+                    break
+        return best, best_move
+
+    def solve(self, board, tick=None):
+        """Solve a partitioned position.
+
+        Returns
+        -------
+        (bool, (int, int), int, int) or None
+            None if the position is not partitioned. Otherwise whether the
+            active player wins, the first move of the active player's longest
+            path (None if they have no move), and the longest path lengths
+            of the active and the inactive player.
+        """
+        if not board.is_partitioned():
+            return None
+        inactive_length, _ = self.longest_path(board, board.inactive_player, tick)
+        active_length, move = self.longest_path(board, board.active_player, tick)
+        return active_length > inactive_length, move, active_length, inactive_length
+
+    def _children(self, geometry, loc, region):
+        """Return the (cell, region) pairs of the moves from `loc`, with the
+        cells reachable after each move, fewest onward moves first so that
+        long paths are found early (Warnsdorff's rule).
+        """
+        moves = geometry.knight_masks[loc] & region
+        children = []
+        while moves:
+            low = moves & -moves
+            moves ^= low
+            idx = low.bit_length() - 1
+            subregion = geometry.flood(low, region & ~low)
+            children.append((_popcount(geometry.knight_masks[idx] & subregion), idx, subregion))
+        children.sort()
+        return [(idx, subregion) for _, idx, subregion in children]
+
+    def _longest(self, geometry, loc, region, tick):
+        cache = self._caches.get(geometry)
+        if cache is None:
+            cache = self._caches[geometry] = {}
+        key = (loc, region)
+        best = cache.get(key)
+        if best is not None:
+            return best
+        if tick is not None:
+            tick()
+
+        best = 0
+        if geometry.knight_masks[loc] & region:
+            bound = self.upper_bound(geometry, loc, region)
+            for idx, subregion in self._children(geometry, loc, region):
+                length = 1 + self._longest(geometry, idx, subregion, tick)
+                if length > best:
+                    best = length
+                    if best >= bound:
+                        break
+
+        if len(cache) >= self.max_entries:
+            cache.clear()
+        cache[key] = best
+        return best
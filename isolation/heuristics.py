@@ -0,0 +1,151 @@
+"""
+This file contains fast versions of the evaluation functions of
+`game_agent.py` and `sample_players.py`.
+
+The evaluation function is called at every leaf of the search tree, and the
+public `Board` API makes it look up both players, build coordinate tuples
+and convert counts to floats on every call. The kernels below read the
+board's bitboard state directly and take everything that only depends on
+the board size from `HeuristicTables`, which are computed once per
+geometry. Every kernel returns exactly the value of the function it
+replaces.
+"""
+import math
+
+from .isolation import _popcount
+
+
+class HeuristicTables(object):
+    """Per-cell lookup tables for one board size.
+
+    Attributes
+    ----------
+    centre_distance : tuple<float>
+        For every cell index, the squared distance between the cell and the
+        centre of the board, as computed by `sample_players.center_score`.
+
+    corner_distance : tuple<float>
+        For every cell index, the distance used by `game_agent.custom_score_2`
+        (from the point (width, height) in (row, column) coordinates).
+    """
+    __slots__ = ("centre_distance", "corner_distance")
+
+    def __init__(self, geometry):
+        w, h = geometry.width / 2., geometry.height / 2.
+        self.centre_distance = tuple(float((h - y)**2 + (w - x)**2)
+                                     for y, x in geometry.coords)
+        self.corner_distance = tuple(
+            math.sqrt((geometry.width - r) ** 2 + (geometry.height - c) ** 2)
+            for r, c in geometry.coords)
+
+
+_TABLES = {}
+
+
+def tables(game):
+    """Return the `HeuristicTables` for the size of a board."""
+    geometry = game._geometry
+    table = _TABLES.get(geometry)
+    if table is None:
+        table = _TABLES[geometry] = HeuristicTables(geometry)
+    return table
+
+
+def _locations(game, player):
+    """Return the cell indices (or None) of `player` and of their opponent."""
+    if player == game._player_1:
+        return game._loc1, game._loc2
+    elif player == game._player_2:
+        return game._loc2, game._loc1
+    raise RuntimeError("`player` must be an object registered as a player in the current game.")
+
+
+def _mobility(game, loc):
+    """Return the number of legal moves from the cell index `loc`, or from
+    anywhere on the board before the player has been placed.
+    """
+    if loc is None:
+        return game._geometry.full_mask.bit_length() - _popcount(game._occupied)
+    return _popcount(game._geometry.knight_masks[loc] & ~game._occupied)
+
+
+def weighted_mobility(game, player):
+    """Half of the player's number of legal moves minus the opponent's
+    (`game_agent.custom_score`).
+    """
+    own, opp = _locations(game, player)
+    if own is None or opp is None:
+        return _mobility(game, own) * 0.5 - _mobility(game, opp)
+    free = ~game._occupied
+    knight_masks = game._geometry.knight_masks
+    return _popcount(knight_masks[own] & free) * 0.5 - _popcount(knight_masks[opp] & free)
+
+
+def corner_distance(game, player):
+    """The difference between the players' distances from the point
+    (width, height) (`game_agent.custom_score_2`).
+    """
+    own, opp = _locations(game, player)
+    table = tables(game).corner_distance
+    return table[own] - table[opp]
+
+
+def mobility_difference(game, player):
+    """The player's number of legal moves minus the opponent's
+    (`game_agent.custom_score_3`).
+    """
+    own, opp = _locations(game, player)
+    if own is None or opp is None:
+        return float(_mobility(game, own) - _mobility(game, opp))
+    free = ~game._occupied
+    knight_masks = game._geometry.knight_masks
+    return float(_popcount(knight_masks[own] & free) - _popcount(knight_masks[opp] & free))
+
+
+def open_move_score(game, player):
+    """The player's number of legal moves, or +/-inf if the game is over
+    (`sample_players.open_move_score`).
+    """
+    own, opp = _locations(game, player)
+    if player == game._active_player:
+        own_moves = _mobility(game, own)
+        if not own_moves:
+            return float("-inf")
+        return float(own_moves)
+    if not _mobility(game, opp):
+        return float("inf")
+    return float(_mobility(game, own))
+
+
+def improved_score(game, player):
+    """The player's number of legal moves minus the opponent's, or +/-inf if
+    the game is over (`sample_players.improved_score`).
+    """
+    own, opp = _locations(game, player)
+    if own is None or opp is None:
+        own_moves = _mobility(game, own)
+        opp_moves = _mobility(game, opp)
+    else:
+        free = ~game._occupied
+        knight_masks = game._geometry.knight_masks
+        own_moves = _popcount(knight_masks[own] & free)
+        opp_moves = _popcount(knight_masks[opp] & free)
+    if player == game._active_player:
+        if not own_moves:
+            return float("-inf")
+    elif not opp_moves:
+        return float("inf")
+    return float(own_moves - opp_moves)
+
+
+def center_score(game, player):
+    """The squared distance of the player from the centre of the board, or
+    +/-inf if the game is over (`sample_players.center_score`).
+    """
+    own, opp = _locations(game, player)
+    if player == game._active_player:
+        if not _mobility(game, own):
+            return float("-inf")
+    elif not _mobility(game, opp):
+        return float("inf")
+    return tables(game).centre_distance[own]
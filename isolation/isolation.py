@@ -8,16 +8,285 @@ remain compatible with the defaults provided, and none of your changes will
 be available to project reviewers.
 """
 import random
-import timeit
-from copy import copy
+import struct
+import time
+from collections import namedtuple
 
 TIME_LIMIT_MILLIS = 150
 
+# Relative (row, column) offsets of the eight L-shaped knight moves
+_KNIGHT_DIRECTIONS = ((-2, -1), (-2, 1), (-1, -2), (-1, 2),
+                      (1, -2), (1, 2), (2, -1), (2, 1))
+
+_perf_counter_ns = time.perf_counter_ns
+
+try:
+    _popcount = int.bit_count
+except AttributeError:  # Python < 3.10
+    def _popcount(mask):
+        return bin(mask).count("1")
+
+# One entry of the per-move telemetry reported by Board.play(); see MoveLog
+MoveRecord = namedtuple("MoveRecord", ["move_number", "player", "move",
+                                       "legal_move_count", "wall_time_ms",
+                                       "time_left_ms", "termination"])
+
+# Header of the binary position format: width, height, move count, player 1
+# and player 2 cell index (_NO_LOCATION before placement), side-to-move flag
+_RECORD_HEADER = struct.Struct("<BBHHHB")
+_NO_LOCATION = 0xFFFF
+
+# The dihedral transforms of a board with n rows and m columns, as functions
+# of (row, column, n, m). Transforms 1, 3, 6 and 7 only exist on square boards
+_TRANSFORMS = (
+    lambda r, c, n, m: (r, c),                  # identity
+    lambda r, c, n, m: (c, n - 1 - r),          # rotate 90 degrees
+    lambda r, c, n, m: (n - 1 - r, m - 1 - c),  # rotate 180 degrees
+    lambda r, c, n, m: (m - 1 - c, r),          # rotate 270 degrees
+    lambda r, c, n, m: (n - 1 - r, c),          # mirror rows
+    lambda r, c, n, m: (r, m - 1 - c),          # mirror columns
+    lambda r, c, n, m: (c, r),                  # transpose
+    lambda r, c, n, m: (m - 1 - c, n - 1 - r),  # anti-transpose
+)
+_INVERSE_TRANSFORMS = (0, 3, 2, 1, 4, 5, 6, 7)
+
+# Precomputed move tables shared between all boards with the same dimensions
+_GEOMETRIES = {}
+
+
+class _BoardGeometry(object):
+    """Lookup tables for one board size, computed once per (width, height).
+
+    Cell indices follow the board layout used throughout this module:
+    ``idx = row + column * height``.
+
+    Attributes
+    ----------
+    coords : tuple<(int, int)>
+        The (row, column) coordinate pair of every cell index.
+
+    full_mask : int
+        The bitmask with one bit set for every cell of the board.
+
+    byte_coords : tuple<tuple<tuple<(int, int)>>>
+        byte_coords[k][b] holds the coordinate pairs of the cells 8*k + i
+        for every bit i set in the byte value b, so that the cells of any
+        bitmask can be listed one byte at a time (see mask_coords()).
+
+    knight_masks : tuple<int>
+        For every cell index, a bitmask of the cells a knight can reach.
+
+    neighbours : tuple<tuple<(int, (int, int))>>
+        For every cell index, the (index, (row, column)) pairs of the cells
+        a knight can reach, in a fixed order.
+
+    knight_shifts : tuple<(int, int)>
+        For every knight direction, the (shift, source_mask) pair that moves
+        a whole bitmask of cells one knight jump in that direction: the cells
+        in source_mask are those whose destination is on the board, and the
+        destination index is the source index plus shift.
+
+    light_mask : int
+        The bitmask of the cells whose row + column is even. Every knight
+        move changes the colour of the cell.
+
+    zobrist_blocked : tuple<int>
+        Random 64-bit keys for "cell idx is blocked".
+
+    zobrist_location : (tuple<int>, tuple<int>)
+        Random 64-bit keys for "player 1 (resp. player 2) stands on cell idx".
+
+    zobrist_enter : (tuple<int>, tuple<int>)
+        The key change when player 1 (resp. player 2) moves onto cell idx:
+        the player's location key combined with the key for blocking idx.
+
+    zobrist_side : int
+        Random 64-bit key toggled on every move to encode the side to move.
+
+    transforms : dict<int, tuple<int>>
+        For every symmetry of the board (all 8 dihedral transforms of a
+        square board, or the 4 of a rectangular one), the permutation that
+        maps each cell index to its image under the transform.
+    """
+    __slots__ = ("width", "height", "coords", "full_mask", "byte_coords",
+                 "knight_masks", "neighbours", "knight_shifts", "light_mask",
+                 "zobrist_blocked", "zobrist_location", "zobrist_enter",
+                 "zobrist_side", "transforms")
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.coords = tuple((idx % height, idx // height)
+                            for idx in range(width * height))
+        self.full_mask = (1 << (width * height)) - 1
+        self.byte_coords = tuple(
+            tuple(tuple(self.coords[base + bit] for bit in range(8)
+                        if value >> bit & 1 and base + bit < width * height)
+                  for value in range(256))
+            for base in range(0, width * height, 8))
+
+        masks = []
+        neighbours = []
+        for r, c in self.coords:
+            cells = tuple((r + dr + (c + dc) * height, (r + dr, c + dc))
+                          for dr, dc in _KNIGHT_DIRECTIONS
+                          if 0 <= r + dr < height and 0 <= c + dc < width)
+            mask = 0
+            for idx, _ in cells:
+                mask |= 1 << idx
+            masks.append(mask)
+            neighbours.append(cells)
+        self.knight_masks = tuple(masks)
+        self.neighbours = tuple(neighbours)
+
+        shifts = []
+        for dr, dc in _KNIGHT_DIRECTIONS:
+            source = 0
+            for idx, (r, c) in enumerate(self.coords):
+                if 0 <= r + dr < height and 0 <= c + dc < width:
+                    source |= 1 << idx
+            shifts.append((dr + dc * height, source))
+        self.knight_shifts = tuple(shifts)
+        self.light_mask = sum(1 << idx for idx, (r, c) in enumerate(self.coords)
+                              if (r + c) % 2 == 0)
+
+        # Seed from the dimensions so keys are stable across processes
+        rng = random.Random("isolation-zobrist-{}x{}".format(width, height))
+        cells = range(width * height)
+        self.zobrist_blocked = tuple(rng.getrandbits(64) for _ in cells)
+        self.zobrist_location = tuple(tuple(rng.getrandbits(64) for _ in cells)
+                                      for _ in range(2))
+        self.zobrist_enter = tuple(tuple(self.zobrist_blocked[idx] ^ keys[idx] for idx in cells)
+                                   for keys in self.zobrist_location)
+        self.zobrist_side = rng.getrandbits(64)
+        self._init_transforms()
+
+    def mask_coords(self, mask):
+        """Return the (row, column) pairs of the cells set in a bitmask, in
+        increasing cell index order, in O(number of bytes) table lookups.
+        """
+        coords = []
+        extend = coords.extend
+        for table in self.byte_coords:
+            if mask & 255:
+                extend(table[mask & 255])
+            mask >>= 8
+        return coords
+
+    def spread(self, mask):
+        """Return the bitmask of every cell one knight move away from any
+        cell of `mask`.
+        """
+        result = 0
+        for shift, source in self.knight_shifts:
+            if shift > 0:
+                result |= (mask & source) << shift
+            else:
+                result |= (mask & source) >> -shift
+        return result
+
+    def flood(self, start, empty):
+        """Return the bitmask of the cells of `empty` that a knight standing
+        on any cell of `start` can reach through a sequence of moves that
+        only visit cells of `empty`.
+        """
+        reached = 0
+        frontier = start
+        while frontier:
+            frontier = self.spread(frontier) & empty & ~reached
+            reached |= frontier
+        return reached
+
+    def _init_transforms(self):
+        width, height = self.width, self.height
+        ids = range(8) if width == height else (0, 2, 4, 5)
+        self.transforms = {}
+        for t in ids:
+            self.transforms[t] = tuple(r + c * height for r, c in
+                                       (_TRANSFORMS[t](r, c, height, width) for r, c in self.coords))
+
+    def transform_mask(self, mask, transform):
+        """Return the image of a cell bitmask under a symmetry transform."""
+        perm = self.transforms[transform]
+        image = 0
+        while mask:
+            low = mask & -mask
+            image |= 1 << perm[low.bit_length() - 1]
+            mask ^= low
+        return image
+
+    def zobrist_hash(self, occupied, loc1, loc2, move_count):
+        """Compute the Zobrist key of a position from scratch."""
+        key = self.zobrist_side if move_count & 1 else 0
+        while occupied:
+            low = occupied & -occupied
+            key ^= self.zobrist_blocked[low.bit_length() - 1]
+            occupied ^= low
+        if loc1 is not None:
+            key ^= self.zobrist_location[0][loc1]
+        if loc2 is not None:
+            key ^= self.zobrist_location[1][loc2]
+        return key
+
+
+def _geometry(width, height):
+    """Return the shared `_BoardGeometry` for a board of the given size."""
+    geometry = _GEOMETRIES.get((width, height))
+    if geometry is None:
+        geometry = _GEOMETRIES[(width, height)] = _BoardGeometry(width, height)
+    return geometry
+
+
+class Deadline(object):
+    """The time limit of one turn, measured with `time.perf_counter_ns`.
+
+    A Deadline is callable and returns the number of milliseconds left, so
+    Board.play() passes it to get_move() as the usual `time_left` function;
+    agents that know about it can use its integer nanosecond API instead.
+
+    Parameters
+    ----------
+    time_limit : numeric
+        The number of milliseconds until the deadline expires.
+
+    start_ns : int (optional)
+        The `time.perf_counter_ns()` reading the limit counts from; defaults
+        to now.
+    """
+    __slots__ = ("time_limit", "start_ns", "expires_ns")
+
+    def __init__(self, time_limit, start_ns=None):
+        if start_ns is None:
+            start_ns = _perf_counter_ns()
+        self.time_limit = time_limit
+        self.start_ns = start_ns
+        self.expires_ns = start_ns + int(time_limit * 1000000)
+
+    def __call__(self):
+        return (self.expires_ns - _perf_counter_ns()) / 1000000.
+
+    def remaining_ns(self):
+        """Return the number of nanoseconds left (negative once expired)."""
+        return self.expires_ns - _perf_counter_ns()
+
+    def elapsed_ns(self):
+        """Return the number of nanoseconds since the deadline started."""
+        return _perf_counter_ns() - self.start_ns
+
+    def expired(self, margin_ns=0):
+        """Test whether less than `margin_ns` nanoseconds are left."""
+        return self.expires_ns - _perf_counter_ns() < margin_ns
+
 
 class Board(object):
     """Implement a model for the game Isolation assuming each player moves like
     a knight in chess.
 
+    The game state is stored as a bitboard: a single integer whose bit `idx`
+    is set once the cell with index ``row + column * height`` has been
+    occupied, plus the cell index of each player (or None before the player
+    has been placed on the board).
+
     Parameters
     ----------
     player_1 : object
@@ -33,11 +302,28 @@ class Board(object):
 
     height : int (optional)
         The number of rows that the board should have.
+
+    shuffle : bool (optional)
+        If True (the default), the moves returned by get_legal_moves() are
+        shuffled when they are generated (once per game state; the list is
+        cached until the next move). If False, moves are always generated in
+        the same fixed order, which is cheaper and makes searches
+        reproducible.
+
+    seed : hashable (optional)
+        When given (and `shuffle` is True), the board shuffles moves with its
+        own `random.Random` instance seeded with this value instead of the
+        global `random` module. Copies of the board share the generator.
     """
     BLANK = 0
     NOT_MOVED = None
 
-    def __init__(self, player_1, player_2, width=7, height=7):
+    __slots__ = ("width", "height", "move_count",
+                 "_player_1", "_player_2", "_active_player", "_inactive_player",
+                 "_occupied", "_loc1", "_loc2", "_zobrist",
+                 "_geometry", "_shuffle", "_rng", "_undo", "_moves1", "_moves2")
+
+    def __init__(self, player_1, player_2, width=7, height=7, shuffle=True, seed=None):
         self.width = width
         self.height = height
         self.move_count = 0
@@ -46,14 +332,95 @@ class Board(object):
         self._active_player = player_1
         self._inactive_player = player_2
 
-        # The last 3 entries of the board state includes initiative (0 for
-        # player 1, 1 for player 2) player 2 last move, and player 1 last move
-        self._board_state = [Board.BLANK] * (width * height + 3)
-        self._board_state[-1] = Board.NOT_MOVED
-        self._board_state[-2] = Board.NOT_MOVED
+        # Bit i of the occupancy mask is set once cell i has been visited;
+        # _loc1 and _loc2 hold the current cell index of each player
+        self._occupied = 0
+        self._loc1 = Board.NOT_MOVED
+        self._loc2 = Board.NOT_MOVED
+        self._zobrist = 0
+        self._geometry = _geometry(width, height)
+        self._shuffle = shuffle
+        # None stands for the shared module-level generator, which (unlike a
+        # Random instance) cannot be pickled or deep-copied
+        self._rng = None if seed is None else random.Random(seed)
+
+        # Previous location of the moving player for every push_move() call
+        self._undo = []
+
+        # Legal moves of each player in the current state, once generated
+        self._moves1 = None
+        self._moves2 = None
 
     def hash(self):
-        return str(self._board_state).__hash__()
+        return self._zobrist
+
+    @property
+    def zobrist_key(self):
+        """A 64-bit Zobrist key of the current game state, covering the
+        blocked cells, both player locations and the side to move.
+
+        The key is maintained incrementally by apply_move() and push_move(),
+        so reading it is O(1). Keys depend only on the position and the
+        board dimensions, so they are stable between boards and processes.
+        """
+        return self._zobrist
+
+    def canonical_key(self):
+        """Return the smallest Zobrist key among all symmetric images of the
+        current position, and the transform that produces it.
+
+        Positions that are equivalent under a rotation or reflection of the
+        board share the same canonical key, so it can be used to share
+        entries between symmetric positions in any position cache. Use
+        transform_move() to map moves between the board and the canonical
+        frame.
+
+        Returns
+        -------
+        (int, int)
+            The canonical key and the id of the transform mapping the current
+            position onto its canonical image.
+        """
+        geometry = self._geometry
+        best_key, best_transform = self._zobrist, 0
+        for transform, perm in geometry.transforms.items():
+            if transform == 0:
+                continue
+            key = geometry.zobrist_hash(geometry.transform_mask(self._occupied, transform),
+                                        None if self._loc1 is None else perm[self._loc1],
+                                        None if self._loc2 is None else perm[self._loc2],
+                                        self.move_count)
+            if key < best_key:
+                best_key, best_transform = key, transform
+        return best_key, best_transform
+
+    def symmetries(self):
+        """Return the ids of the non-identity transforms that map the current
+        position onto itself (an empty list for asymmetric positions).
+        """
+        geometry = self._geometry
+        loc1, loc2 = self._loc1, self._loc2
+        found = []
+        for transform, perm in geometry.transforms.items():
+            if transform == 0:
+                continue
+            if loc1 is not None and perm[loc1] != loc1:
+                continue
+            if loc2 is not None and perm[loc2] != loc2:
+                continue
+            if geometry.transform_mask(self._occupied, transform) == self._occupied:
+                found.append(transform)
+        return found
+
+    def transform_move(self, move, transform, inverse=False):
+        """Map a (row, column) move through a symmetry transform, or through
+        its inverse if `inverse` is True (e.g., to map a move from the
+        canonical frame returned by canonical_key() back onto this board).
+        """
+        if inverse:
+            transform = _INVERSE_TRANSFORMS[transform]
+        geometry = self._geometry
+        return geometry.coords[geometry.transforms[transform][move[0] + move[1] * self.height]]
 
     @property
     def active_player(self):
@@ -92,12 +459,163 @@ class Board(object):
 
     def copy(self):
         """ Return a deep copy of the current board. """
-        new_board = Board(self._player_1, self._player_2, width=self.width, height=self.height)
+        new_board = Board.__new__(Board)
+        self._copy_state(new_board)
+        new_board._undo = []
+        return new_board
+
+    def snapshot(self):
+        """Return a read-only `BoardSnapshot` of the current game state.
+
+        The board state is made of immutable values, so taking a snapshot is
+        O(1) and never copies the state; the snapshot only refuses to be
+        modified. Call copy() on the snapshot to get a mutable board.
+        """
+        snapshot = BoardSnapshot.__new__(BoardSnapshot)
+        self._copy_state(snapshot)
+        snapshot._undo = ()
+        return snapshot
+
+    @staticmethod
+    def record_size(width=7, height=7):
+        """Return the number of bytes used by to_bytes() for one position on
+        a board with the given dimensions.
+        """
+        return _RECORD_HEADER.size + (width * height + 7) // 8
+
+    def to_bytes(self):
+        """Encode the game state as a compact binary record.
+
+        The record holds the board dimensions, the move count, both player
+        locations, the side to move and the occupancy bitmask; it does not
+        include the player objects. A 7x7 position takes 16 bytes.
+
+        Returns
+        -------
+        bytes
+        """
+        buffer = bytearray(Board.record_size(self.width, self.height))
+        self.pack_into(buffer)
+        return bytes(buffer)
+
+    def pack_into(self, buffer, offset=0):
+        """Write the to_bytes() record into a writable buffer (e.g., a
+        bytearray, memoryview or mmap) at the given offset.
+        """
+        _RECORD_HEADER.pack_into(buffer, offset, self.width, self.height, self.move_count,
+                                 _NO_LOCATION if self._loc1 is None else self._loc1,
+                                 _NO_LOCATION if self._loc2 is None else self._loc2,
+                                 self.move_count & 1)
+        size = (self.width * self.height + 7) // 8
+        start = offset + _RECORD_HEADER.size
+        buffer[start:start + size] = self._occupied.to_bytes(size, "little")
+
+    @classmethod
+    def from_bytes(cls, data, player_1, player_2, offset=0):
+        """Decode a position written by to_bytes() or pack_into().
+
+        Parameters
+        ----------
+        data : bytes-like object
+            Any object supporting the buffer protocol; the record is read
+            through a memoryview, so the data is not copied.
+
+        player_1, player_2 : object
+            The player objects to register on the decoded board.
+
+        offset : int (optional)
+            The position of the record within `data`.
+
+        Returns
+        -------
+        isolation.Board
+        """
+        view = memoryview(data)
+        width, height, move_count, loc1, loc2, side = _RECORD_HEADER.unpack_from(view, offset)
+        if side != move_count & 1:
+            raise ValueError("Corrupt board record: side to move does not match the move count.")
+        start = offset + _RECORD_HEADER.size
+        occupied = int.from_bytes(view[start:start + (width * height + 7) // 8], "little")
+        board = cls(player_1, player_2, width, height)
+        board._set_state(occupied,
+                         None if loc1 == _NO_LOCATION else loc1,
+                         None if loc2 == _NO_LOCATION else loc2,
+                         move_count)
+        return board
+
+    @staticmethod
+    def pack_many(boards):
+        """Encode a sequence of boards of the same size into one buffer of
+        consecutive fixed-size to_bytes() records.
+
+        Returns
+        -------
+        bytearray
+        """
+        boards = list(boards)
+        if not boards:
+            return bytearray()
+        width, height = boards[0].width, boards[0].height
+        size = Board.record_size(width, height)
+        buffer = bytearray(size * len(boards))
+        for i, board in enumerate(boards):
+            if board.width != width or board.height != height:
+                raise ValueError("All boards packed together must have the same dimensions.")
+            board.pack_into(buffer, i * size)
+        return buffer
+
+    @classmethod
+    def unpack_many(cls, data, player_1, player_2):
+        """Decode every record of a buffer written by pack_many().
+
+        Returns
+        -------
+        list<isolation.Board>
+        """
+        view = memoryview(data)
+        if not len(view):
+            return []
+        width, height = view[0], view[1]
+        size = Board.record_size(width, height)
+        return [cls.from_bytes(view, player_1, player_2, offset)
+                for offset in range(0, len(view), size)]
+
+    def _set_state(self, occupied, loc1, loc2, move_count):
+        """Overwrite the game state from its raw fields: the occupancy mask,
+        the cell index (or None) of each player and the move count.
+        """
+        self._occupied = occupied
+        self._loc1 = loc1
+        self._loc2 = loc2
+        self.move_count = move_count
+        if move_count & 1:
+            self._active_player, self._inactive_player = self._player_2, self._player_1
+        else:
+            self._active_player, self._inactive_player = self._player_1, self._player_2
+        self._zobrist = self._geometry.zobrist_hash(occupied, loc1, loc2, move_count)
+        self._undo = []
+        self._moves1 = self._moves2 = None
+
+    def _copy_state(self, new_board):
+        """Copy every field except the undo stack onto an uninitialized board
+        without going through __init__.
+        """
+        new_board.width = self.width
+        new_board.height = self.height
         new_board.move_count = self.move_count
+        new_board._player_1 = self._player_1
+        new_board._player_2 = self._player_2
         new_board._active_player = self._active_player
         new_board._inactive_player = self._inactive_player
-        new_board._board_state = copy(self._board_state)
-        return new_board
+        new_board._occupied = self._occupied
+        new_board._loc1 = self._loc1
+        new_board._loc2 = self._loc2
+        new_board._zobrist = self._zobrist
+        new_board._geometry = self._geometry
+        new_board._shuffle = self._shuffle
+        new_board._rng = self._rng
+        new_board._moves1 = self._moves1
+        new_board._moves2 = self._moves2
 
     def forecast_move(self, move):
         """Return a deep copy of the current game with an input move applied to
@@ -132,15 +650,14 @@ class Board(object):
         bool
             Returns True if the move is legal, False otherwise
         """
-        idx = move[0] + move[1] * self.height
         return (0 <= move[0] < self.height and 0 <= move[1] < self.width and
-                self._board_state[idx] == Board.BLANK)
+                not self._occupied >> (int(move[0]) + int(move[1]) * self.height) & 1)
 
     def get_blank_spaces(self):
         """Return a list of the locations that are still available on the board.
         """
-        return [(i, j) for j in range(self.width) for i in range(self.height)
-                if self._board_state[i + j * self.height] == Board.BLANK]
+        geometry = self._geometry
+        return geometry.mask_coords(geometry.full_mask & ~self._occupied)
 
     def get_player_location(self, player):
         """Find the current location of the specified player on the board.
@@ -157,19 +674,15 @@ class Board(object):
             if the player has not moved.
         """
         if player == self._player_1:
-            if self._board_state[-1] == Board.NOT_MOVED:
-                return Board.NOT_MOVED
-            idx = self._board_state[-1]
+            idx = self._loc1
         elif player == self._player_2:
-            if self._board_state[-2] == Board.NOT_MOVED:
-                return Board.NOT_MOVED
-            idx = self._board_state[-2]
+            idx = self._loc2
         else:
             raise RuntimeError(
                 "Invalid player in get_player_location: {}".format(player))
-        w = idx // self.height
-        h = idx % self.height
-        return (h, w)
+        if idx is Board.NOT_MOVED:
+            return Board.NOT_MOVED
+        return self._geometry.coords[idx]
 
     def get_legal_moves(self, player=None):
         """Return the list of all legal moves for the specified player.
@@ -187,8 +700,113 @@ class Board(object):
             for the player constrained by the current game state.
         """
         if player is None:
-            player = self.active_player
-        return self.__get_moves(self.get_player_location(player))
+            player = self._active_player
+        if player == self._player_1:
+            moves = self._moves1
+            if moves is None:
+                moves = self._moves1 = tuple(self.__get_moves(self._loc1))
+        elif player == self._player_2:
+            moves = self._moves2
+            if moves is None:
+                moves = self._moves2 = tuple(self.__get_moves(self._loc2))
+        else:
+            raise RuntimeError(
+                "Invalid player in get_legal_moves: {}".format(player))
+        return list(moves)
+
+    def has_legal_moves(self, player=None):
+        """Test whether the specified player (by default, the active player)
+        has any legal move, without generating the list of moves.
+        """
+        loc = self._location(player)
+        if loc is Board.NOT_MOVED:
+            return self._occupied != self._geometry.full_mask
+        return bool(self._geometry.knight_masks[loc] & ~self._occupied)
+
+    def legal_move_count(self, player=None):
+        """Return the number of legal moves of the specified player (by
+        default, the active player), without generating the list of moves.
+        """
+        loc = self._location(player)
+        if loc is Board.NOT_MOVED:
+            return self._geometry.full_mask.bit_length() - _popcount(self._occupied)
+        return _popcount(self._geometry.knight_masks[loc] & ~self._occupied)
+
+    def reachable(self, player=None):
+        """Return the bitmask of the empty cells that the specified player
+        (by default, the active player) could still reach through any
+        sequence of its own moves, ignoring the moves of the opponent. A
+        player who has not been placed can reach every empty cell.
+
+        Cell i is bit i of the mask, with ``i = row + column * height``.
+        """
+        loc = self._location(player)
+        geometry = self._geometry
+        empty = geometry.full_mask & ~self._occupied
+        if loc is Board.NOT_MOVED:
+            return empty
+        return geometry.flood(1 << loc, empty)
+
+    def is_partitioned(self):
+        """Test whether the players have been separated, i.e., whether no
+        empty cell is reachable by both players. From then on the moves of
+        one player can no longer affect the other, and each player simply
+        makes as many moves as the longest knight path through the cells
+        they can reach (see `isolation.endgame`).
+        """
+        if self._loc1 is Board.NOT_MOVED or self._loc2 is Board.NOT_MOVED:
+            return False
+        return not self.reachable(self._player_1) & self.reachable(self._player_2)
+
+    def random_playout(self, rng=None):
+        """Play uniformly random moves from the current state until one
+        player has no legal moves, without changing the board, and return
+        the winner.
+
+        The playout runs directly on the occupancy bitmask, so it neither
+        allocates move lists nor shuffles them.
+
+        Parameters
+        ----------
+        rng : random.Random (optional)
+            The random number generator; by default the board's own.
+
+        Returns
+        -------
+        object
+            The player object that wins the simulated game.
+        """
+        randrange = (rng or self._rng or random).randrange
+        knight_masks = self._geometry.knight_masks
+        free = self._geometry.full_mask & ~self._occupied
+        locs = [self._loc1, self._loc2]
+        side = self.move_count & 1
+        while True:
+            loc = locs[side]
+            moves = free if loc is Board.NOT_MOVED else knight_masks[loc] & free
+            if not moves:
+                break
+            for _ in range(randrange(_popcount(moves))):
+                moves &= moves - 1
+            low = moves & -moves
+            free ^= low
+            locs[side] = low.bit_length() - 1
+            side ^= 1
+        # The player to move has lost
+        return self._player_1 if side else self._player_2
+
+    def _location(self, player):
+        """Return the cell index (or None) of a player, or of the active
+        player if `player` is None.
+        """
+        if player is None:
+            return self._loc2 if self.move_count & 1 else self._loc1
+        if player == self._player_1:
+            return self._loc1
+        elif player == self._player_2:
+            return self._loc2
+        raise RuntimeError(
+            "Invalid player: {}".format(player))
 
     def apply_move(self, move):
         """Move the active player to a specified location.
@@ -200,20 +818,75 @@ class Board(object):
             the active player on the board.
         """
         idx = move[0] + move[1] * self.height
-        last_move_idx = int(self.active_player == self._player_2) + 1
-        self._board_state[-last_move_idx] = idx
-        self._board_state[idx] = 1
-        self._board_state[-3] ^= 1
+        if type(idx) is not int:
+            # e.g. NumPy integers, which would turn the bitmasks into
+            # fixed-width integers
+            idx = int(move[0]) + int(move[1]) * self.height
+        geometry = self._geometry
+        slot = self.move_count & 1
+        previous = self._loc2 if slot else self._loc1
+        key = self._zobrist ^ geometry.zobrist_enter[slot][idx] ^ geometry.zobrist_side
+        if previous is not Board.NOT_MOVED:
+            key ^= geometry.zobrist_location[slot][previous]
+        if slot:
+            self._loc2 = idx
+        else:
+            self._loc1 = idx
+        self._occupied |= 1 << idx
+        self._zobrist = key
+        self._moves1 = self._moves2 = None
         self._active_player, self._inactive_player = self._inactive_player, self._active_player
         self.move_count += 1
 
+    def push_move(self, move):
+        """Apply a move in-place like apply_move(), but remember enough state
+        to take it back again with pop_move().
+
+        Search code can use push_move()/pop_move() pairs to walk the game
+        tree on a single board object instead of allocating a new board for
+        every node with forecast_move().
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+        """
+        self._undo.append(self._loc2 if self.move_count & 1 else self._loc1)
+        self.apply_move(move)
+
+    def pop_move(self):
+        """Undo the most recent move applied with push_move().
+
+        Returns
+        -------
+        (int, int)
+            The coordinate pair (row, column) of the move that was undone.
+        """
+        previous = self._undo.pop()
+        self.move_count -= 1
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        geometry = self._geometry
+        slot = self.move_count & 1
+        if slot:
+            idx, self._loc2 = self._loc2, previous
+        else:
+            idx, self._loc1 = self._loc1, previous
+        self._occupied &= ~(1 << idx)
+        self._moves1 = self._moves2 = None
+        key = self._zobrist ^ geometry.zobrist_enter[slot][idx] ^ geometry.zobrist_side
+        if previous is not Board.NOT_MOVED:
+            key ^= geometry.zobrist_location[slot][previous]
+        self._zobrist = key
+        return geometry.coords[idx]
+
     def is_winner(self, player):
         """ Test whether the specified player has won the game. """
-        return player == self._inactive_player and not self.get_legal_moves(self._active_player)
+        return player == self._inactive_player and not self.has_legal_moves()
 
     def is_loser(self, player):
         """ Test whether the specified player has lost the game. """
-        return player == self._active_player and not self.get_legal_moves(self._active_player)
+        return player == self._active_player and not self.has_legal_moves()
 
     def utility(self, player):
         """Returns the utility of the current game state from the perspective
@@ -221,7 +894,7 @@ class Board(object):
 
                     /  +infinity,   "player" wins
         utility =  |   -infinity,   "player" loses
-                    \          0,    otherwise
+                    \\          0,    otherwise
 
         Parameters
         ----------
@@ -237,7 +910,7 @@ class Board(object):
             a value of -inf if the player has lost, and a value of 0
             otherwise.
         """
-        if not self.get_legal_moves(self._active_player):
+        if not self.has_legal_moves():
 
             if player == self._inactive_player:
                 return float("inf")
@@ -249,17 +922,16 @@ class Board(object):
 
     def __get_moves(self, loc):
         """Generate the list of possible moves for an L-shaped motion (like a
-        knight in chess).
+        knight in chess) from the cell index `loc`.
         """
-        if loc == Board.NOT_MOVED:
+        if loc is Board.NOT_MOVED:
             return self.get_blank_spaces()
 
-        r, c = loc
-        directions = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
-                      (1, -2), (1, 2), (2, -1), (2, 1)]
-        valid_moves = [(r + dr, c + dc) for dr, dc in directions
-                       if self.move_is_legal((r + dr, c + dc))]
-        random.shuffle(valid_moves)
+        occupied = self._occupied
+        valid_moves = [move for idx, move in self._geometry.neighbours[loc]
+                       if not occupied >> idx & 1]
+        if self._shuffle:
+            (self._rng or random).shuffle(valid_moves)
         return valid_moves
 
     def print_board(self):
@@ -271,8 +943,8 @@ class Board(object):
         the location of each player and indicating which cells have been
         blocked, and which remain open.
         """
-        p1_loc = self._board_state[-1]
-        p2_loc = self._board_state[-2]
+        p1_loc = self._loc1
+        p2_loc = self._loc2
 
         col_margin = len(str(self.height - 1)) + 1
         prefix = "{:<" + "{}".format(col_margin) + "}"
@@ -282,7 +954,7 @@ class Board(object):
             out += prefix.format(i) + ' | '
             for j in range(self.width):
                 idx = i + j * self.height
-                if not self._board_state[idx]:
+                if not self._occupied >> idx & 1:
                     out += ' '
                 elif p1_loc == idx:
                     out += symbols[0]
@@ -295,7 +967,7 @@ class Board(object):
 
         return out
 
-    def play(self, time_limit=TIME_LIMIT_MILLIS):
+    def play(self, time_limit=TIME_LIMIT_MILLIS, observer=None):
         """Execute a match between the players by alternately soliciting them
         to select a move and applying it in the game.
 
@@ -305,6 +977,11 @@ class Board(object):
             The maximum number of milliseconds to allow before timeout
             during each turn.
 
+        observer : callable (optional)
+            Called with a `MoveRecord` after every call to a player's
+            get_move(), including the final one that ends the game (whose
+            record carries the termination reason). See `MoveLog`.
+
         Returns
         ----------
         (player, list<[(int, int),]>, str)
@@ -314,29 +991,100 @@ class Board(object):
         """
         move_history = []
 
-        time_millis = lambda: 1000 * timeit.default_timer()
-
         while True:
 
-            legal_player_moves = self.get_legal_moves()
-            game_copy = self.copy()
+            game_view = self.snapshot()
+            player = self._active_player
+            if observer is not None:
+                legal_move_count = self.legal_move_count()
 
-            move_start = time_millis()
-            time_left = lambda : time_limit - (time_millis() - move_start)
-            curr_move = self._active_player.get_move(game_copy, time_left)
+            time_left = Deadline(time_limit)
+            curr_move = player.get_move(game_view, time_left)
             move_end = time_left()
 
             if curr_move is None:
                 curr_move = Board.NOT_MOVED
 
+            termination = None
             if move_end < 0:
-                return self._inactive_player, move_history, "timeout"
+                termination = "timeout"
+            elif not self._is_legal_active_move(curr_move):
+                termination = "forfeit" if self.has_legal_moves() else "illegal move"
+
+            if observer is not None:
+                observer(MoveRecord(self.move_count + 1, player, curr_move, legal_move_count,
+                                    time_limit - move_end, move_end, termination))
 
-            if curr_move not in legal_player_moves:
-                if len(legal_player_moves) > 0:
-                    return self._inactive_player, move_history, "forfeit"
-                return self._inactive_player, move_history, "illegal move"
+            if termination is not None:
+                return self._inactive_player, move_history, termination
 
             move_history.append(list(curr_move))
 
             self.apply_move(curr_move)
+
+    def _is_legal_active_move(self, move):
+        """Test whether `move` is one of the legal moves of the active player
+        without generating the list of legal moves.
+        """
+        if not isinstance(move, tuple) or len(move) != 2:
+            return False
+        r, c = move
+        if not (0 <= r < self.height and 0 <= c < self.width):
+            return False
+        idx = int(r) + int(c) * self.height
+        if self._occupied >> idx & 1:
+            return False
+        loc = self._loc2 if self.move_count & 1 else self._loc1
+        return loc is Board.NOT_MOVED or bool(self._geometry.knight_masks[loc] >> idx & 1)
+
+
+class BoardSnapshot(Board):
+    """A read-only view of a game state, as handed to the players by
+    Board.play().
+
+    Every query method of `Board` works unchanged, and forecast_move() and
+    copy() return ordinary mutable boards, but apply_move(), push_move() and
+    pop_move() raise a RuntimeError. Create snapshots with Board.snapshot().
+    """
+    __slots__ = ()
+
+    def apply_move(self, move):
+        raise RuntimeError("Cannot apply a move to a read-only board snapshot; use copy() first.")
+
+    def push_move(self, move):
+        raise RuntimeError("Cannot push a move on a read-only board snapshot; use copy() first.")
+
+    def pop_move(self):
+        raise RuntimeError("Cannot pop a move from a read-only board snapshot; use copy() first.")
+
+
+class MoveLog(object):
+    """A `Board.play()` observer that collects the `MoveRecord` of every move.
+
+    A single log can observe any number of games, e.g. a whole tournament:
+
+        log = MoveLog()
+        winner, history, outcome = game.play(observer=log)
+        print(log.near_timeouts(margin=5))
+
+    Each record holds the move number (1-based, counting both players), the
+    player, the returned move, the number of legal moves available, the wall
+    time spent in get_move() and the time left when it returned (both in
+    milliseconds), and the termination reason if the move ended the game.
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, record):
+        self.records.append(record)
+
+    def near_timeouts(self, margin=10.):
+        """Return the records of moves that returned with less than `margin`
+        milliseconds left, including actual timeouts.
+        """
+        return [r for r in self.records if r.time_left_ms < margin]
+
+    def slowest(self, count=10):
+        """Return the `count` records with the longest wall time."""
+        return sorted(self.records, key=lambda r: r.wall_time_ms, reverse=True)[:count]
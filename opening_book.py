@@ -0,0 +1,104 @@
+"""This file generates opening books for Isolation: `generate_book()`
+searches every position of the first few plies offline and writes the best
+move of each one to a compact binary file, which players read with
+`isolation.OpeningBook` (see the `book` option of `AlphaBetaPlayer`).
+
+Usage: python opening_book.py BOOK_FILE [--plies N] [--depth D]
+"""
+from isolation import Board
+from isolation.book import write_book
+from game_agent import AlphaBetaPlayer, board_for, custom_score, search_clock
+
+
+def _search(player, game, depth):
+    """Return the best move of the position `game` for `player` with a
+    fixed-depth iterative deepening search.
+    """
+    board = board_for(game.to_bytes(), player)
+    player.time_left = lambda: float("inf")
+    player.start_search(board)
+    move = None
+    for d in range(1, depth + 1):
+        player._clock = search_clock(player)
+        move, _ = player.search_root(board, d)
+    return move
+
+
+def generate_book(path, plies=3, depth=8, width=7, height=7, score_fn=custom_score,
+                  progress=None):
+    """Search every position reachable in fewer than `plies` moves from the
+    empty board and write the best move of each one to a book file.
+
+    Parameters
+    ----------
+    path : str
+        The output file.
+
+    plies : int (optional)
+        The book covers positions with 0 to plies - 1 moves played.
+
+    depth : int (optional)
+        The search depth used for every position.
+
+    width, height : int (optional)
+        The board dimensions.
+
+    score_fn : callable (optional)
+        The evaluation function of the search.
+
+    progress : callable (optional)
+        Called with (positions searched, positions in total) after every
+        position.
+
+    Returns
+    -------
+    int
+        The number of positions written.
+    """
+    player = AlphaBetaPlayer(score_fn=score_fn)
+
+    # Collect the distinct positions of every ply up to symmetry
+    positions = {}
+    layer = [Board("player 1", "player 2", width, height, shuffle=False)]
+    for ply in range(plies):
+        next_layer = []
+        for game in layer:
+            key, transform = game.canonical_key()
+            if key in positions:
+                continue
+            positions[key] = (game, transform)
+            if ply + 1 < plies:
+                for move in game.get_legal_moves():
+                    next_layer.append(game.forecast_move(move))
+        layer = next_layer
+
+    entries = []
+    for done, (key, (game, transform)) in enumerate(positions.items(), 1):
+        move = _search(player, game, depth)
+        if move is not None and move != (-1, -1):
+            entries.append((key, game.transform_move(move, transform)))
+        if progress is not None:
+            progress(done, len(positions))
+
+    return write_book(path, width, height, entries)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Generate an Isolation opening book.")
+    parser.add_argument("path")
+    parser.add_argument("--plies", type=int, default=3)
+    parser.add_argument("--depth", type=int, default=8)
+    parser.add_argument("--width", type=int, default=7)
+    parser.add_argument("--height", type=int, default=7)
+    args = parser.parse_args()
+
+    def report(done, total):
+        sys.stdout.write("\r{}/{} positions".format(done, total))
+        sys.stdout.flush()
+
+    count = generate_book(args.path, args.plies, args.depth, args.width, args.height,
+                          progress=report)
+    print("\nwrote {} positions to {}".format(count, args.path))
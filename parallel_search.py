@@ -0,0 +1,800 @@
+"""This file contains two multi-process variants of `AlphaBetaPlayer`.
+
+`ParallelAlphaBetaPlayer` splits the root moves of every iterative
+deepening iteration across a persistent pool of worker processes.
+
+Each iteration uses the "young brothers wait" rule at the root: the first
+(principal variation) move is searched in the calling process to establish
+a bound, then the remaining root moves are searched by the workers. The
+workers share the best root value found so far (alpha) through shared
+memory and read it when they start a move, so later moves are searched
+with the tightest known bound. Positions are sent to the workers in the
+compact `Board.to_bytes()` format; every worker keeps its own player
+object, with its own transposition table, for the lifetime of the pool.
+
+`LazySMPPlayer` runs the same iterative deepening search in every worker,
+with different root move orders and depth offsets, and lets the workers
+share their results only through a `SharedTranspositionTable`.
+"""
+import multiprocessing
+import struct
+import time
+import weakref
+from multiprocessing import shared_memory
+
+from isolation import Board, Deadline
+from game_agent import (AlphaBetaPlayer, SearchTimeout, TranspositionTable,
+                        board_for, custom_score, search_clock)
+
+
+# Per-process state of a pool worker, set up by _init_worker() or
+# _init_helper()
+_worker = None
+
+
+def _expires_ns(time_left):
+    """Return the absolute `time.perf_counter_ns()` deadline of a
+    `time_left` function (an `isolation.Deadline` or any callable).
+    """
+    expires_ns = getattr(time_left, "expires_ns", None)
+    if expires_ns is None:
+        expires_ns = time.perf_counter_ns() + int(time_left() * 1000000)
+    return expires_ns
+
+
+def _worker_clock(generation, expected, expires_ns):
+    """Return a `time_left` function for a worker task that runs out at the
+    deadline or as soon as the shared generation counter moves on.
+    """
+    def time_left():
+        if generation.value != expected:
+            return float("-inf")
+        return (expires_ns - time.perf_counter_ns()) / 1000000.
+    return time_left
+
+
+def _reserve(time_left, reserve):
+    """Return a `Deadline` that expires `reserve` milliseconds before the
+    `time_left` function.
+    """
+    start_ns = time.perf_counter_ns()
+    return Deadline((_expires_ns(time_left) - start_ns) / 1000000. - reserve, start_ns)
+
+
+class _Worker(object):
+    """The player and shared values of one worker process."""
+
+    def __init__(self, player_kwargs, alpha, generation):
+        self.player = AlphaBetaPlayer(**player_kwargs)
+        self.alpha = alpha
+        self.generation = generation
+        self.root = None
+        self.game = None
+
+    def search(self, record, move, depth, expires_ns, generation):
+        """Search one root move; see `ParallelAlphaBetaPlayer.search_root`."""
+        if self.generation.value != generation:
+            return None
+
+        player = self.player
+        if record != self.root:
+            # A new root position: rebuild it with this worker's player to move
+            self.game = board_for(record, player)
+            self.root = record
+            player.start_search(self.game)
+
+        player.time_left = _worker_clock(self.generation, generation, expires_ns)
+        player._clock = search_clock(player)
+        alpha = self.alpha.value
+
+        start = time.perf_counter_ns()
+        self.game.push_move(move)
+        try:
+            value = player.minimize(self.game, depth, 1, alpha, float("inf"))
+        except SearchTimeout:
+            return None
+        finally:
+            self.game.pop_move()
+        elapsed = time.perf_counter_ns() - start
+
+        with self.alpha.get_lock():
+            if self.generation.value == generation and value > self.alpha.value:
+                self.alpha.value = value
+        return move, value, alpha, elapsed
+
+
+def _init_worker(player_kwargs, alpha, generation):
+    global _worker
+    _worker = _Worker(player_kwargs, alpha, generation)
+
+
+def _search_move(record, move, depth, expires_ns, generation):
+    return _worker.search(record, move, depth, expires_ns, generation)
+
+
+class ParallelAlphaBetaPlayer(AlphaBetaPlayer):
+    """Game-playing agent that chooses a move using iterative deepening
+    alpha-beta search, with the root moves of every iteration searched in
+    parallel by a pool of worker processes.
+
+    The pool is started on the first call to get_move() and kept until
+    close() is called, so there is no process start-up cost per move.
+
+    The search statistics (`stats`, `last_stats`) and the time manager only
+    count the nodes searched in this process, so the node rate and the
+    effective branching factor they report leave out the workers' nodes.
+
+    Parameters
+    ----------
+    search_depth, score_fn, timeout, symmetry, tt_size, tt_replacement, pvs
+        See `AlphaBetaPlayer`; the workers use the same settings. `score_fn`
+        must be picklable (i.e., a module-level function) unless the pool
+        uses the "fork" start method.
+
+    workers : int (optional)
+        The number of worker processes; defaults to the number of CPUs.
+
+    **kwargs
+        Any other option of `AlphaBetaPlayer` (move_ordering, aspiration,
+        endgame, book, time_manager), also passed to the workers.
+
+    Attributes
+    ----------
+    search_time_ns : int
+        The total time spent searching, summed over this process and all
+        workers, since the player was created.
+
+    wall_time_ns : int
+        The total time spent in get_move() since the player was created.
+    """
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.,
+                 symmetry=False, tt_size=1 << 16, tt_replacement="depth",
+                 pvs=False, workers=None, **kwargs):
+        super().__init__(search_depth=search_depth, score_fn=score_fn, timeout=timeout,
+                         symmetry=symmetry, tt_size=tt_size, tt_replacement=tt_replacement,
+                         pvs=pvs, **kwargs)
+        self.workers = workers or multiprocessing.cpu_count()
+        self._player_kwargs = dict(search_depth=search_depth, score_fn=score_fn,
+                                   timeout=timeout, symmetry=symmetry, tt_size=tt_size,
+                                   tt_replacement=tt_replacement, pvs=pvs, **kwargs)
+        self._pool = None
+        self._alpha = None
+        self._generation = None
+        self._expires_ns = None
+        self.search_time_ns = 0
+        self.wall_time_ns = 0
+
+    @property
+    def utilization(self):
+        """The average number of processes that were searching during
+        get_move(): total search time divided by wall-clock time. This is
+        not a speedup over serial search (see `benchmark` for that), since
+        the parallel search also visits nodes a serial search would prune.
+        """
+        return self.search_time_ns / self.wall_time_ns if self.wall_time_ns else 0.
+
+    def start_pool(self):
+        """Start the worker pool if it is not running yet."""
+        if self._pool is None:
+            self._alpha = multiprocessing.Value("d", float("-inf"))
+            self._generation = multiprocessing.Value("q", 0, lock=False)
+            self._pool = multiprocessing.Pool(self.workers, _init_worker,
+                                              (self._player_kwargs, self._alpha, self._generation))
+
+    def close(self):
+        """Stop the worker pool."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def stop_workers(self):
+        """Make the workers abandon the moves they are searching; a worker
+        notices the request at its next clock check.
+        """
+        with self._alpha.get_lock():
+            self._generation.value += 1
+
+    def get_move(self, game, time_left):
+        """Search for the best move with parallel iterative deepening; see
+        `AlphaBetaPlayer.get_move`.
+        """
+        self.start_pool()
+        start = time.perf_counter_ns()
+        try:
+            return super().get_move(game, time_left)
+        finally:
+            self.stop_workers()
+            self.wall_time_ns += time.perf_counter_ns() - start
+
+    def start_search(self, game):
+        super().start_search(game)
+        self._expires_ns = _expires_ns(self.time_left)
+
+    def search_root(self, game, depth, alpha=float("-inf"), beta=float("inf")):
+        """Search the first root move in this process and the others in the
+        worker pool; see `AlphaBetaPlayer.search_root`.
+
+        The search window is only used for the first move; the workers
+        always search with the shared alpha and an infinite beta.
+        """
+        if self._pool is None:
+            return super().search_root(game, depth, alpha, beta)
+
+        hash_move = self._root_move
+        if self.tt is not None:
+            entry = self.tt.probe(game.zobrist_key)
+            if entry is not None:
+                hash_move = entry[4]
+        moves = self.legal_moves(game, hash_move)
+        if not moves:
+            return (-1, -1), float("-inf")
+
+        # Young brothers wait: the first move sets the bound for the others
+        started = time.perf_counter_ns()
+        game.push_move(moves[0])
+        try:
+            best_value = self.minimize(game, depth, 1, alpha, beta)
+        finally:
+            game.pop_move()
+            self.search_time_ns += time.perf_counter_ns() - started
+        best_move = moves[0]
+
+        if len(moves) > 1 and best_value < beta:
+            with self._alpha.get_lock():
+                self._generation.value += 1
+                self._alpha.value = max(alpha, best_value)
+                generation = self._generation.value
+            record = game.to_bytes()
+            pending = [self._pool.apply_async(_search_move,
+                                              (record, move, depth, self._expires_ns, generation))
+                       for move in moves[1:]]
+            for result in pending:
+                timeout = (self.time_left() - self._clock.threshold) / 1000.
+                try:
+                    outcome = result.get(max(timeout, 0.) if timeout != float("inf") else None)
+                except multiprocessing.TimeoutError:
+                    raise SearchTimeout()
+                if outcome is None:
+                    raise SearchTimeout()
+                move, value, move_alpha, elapsed = outcome
+                self.search_time_ns += elapsed
+                # A value at or below the alpha the worker started from is
+                # only an upper bound, and never better than the best move
+                if value > move_alpha and value > best_value:
+                    best_move, best_value = move, value
+
+        self._root_move = best_move
+        return best_move, best_value
+
+
+class SharedTranspositionTable(object):
+    """A `TranspositionTable` stored in a `multiprocessing.shared_memory`
+    block, so that several processes can read and write the same entries.
+
+    Every entry is a fixed-size ``struct.Struct("<QdQ")`` record (check,
+    value, meta). The meta word packs a valid bit, the bound type, the
+    depth, the move (as ``row * 256 + column``) and the search generation;
+    the check word is ``key ^ value_bits ^ meta``. Entries are written
+    without locks: a reader recomputes the key from the three words, so an
+    entry that was torn by concurrent writes (or belongs to another
+    position) simply does not match and is treated as missing.
+
+    probe() returns the same (key, depth, bound, value, move, generation)
+    tuples as `TranspositionTable`.
+
+    Parameters
+    ----------
+    size, replacement
+        See `TranspositionTable`.
+
+    name : str (optional)
+        The name of an existing shared memory block to attach to. By
+        default a new block is created; it is removed when the creating
+        table is closed or garbage collected, or at interpreter exit.
+    """
+    REPLACEMENT_POLICIES = TranspositionTable.REPLACEMENT_POLICIES
+
+    _HEADER = struct.Struct("<Q")
+    _ENTRY = struct.Struct("<QdQ")
+    _DOUBLE = struct.Struct("<d")
+    _BITS = struct.Struct("<Q")
+
+    _VALID = 1
+    _NO_MOVE = 0xFFFF
+
+    def __init__(self, size=1 << 16, replacement="depth", name=None):
+        if replacement not in self.REPLACEMENT_POLICIES:
+            raise ValueError("Unknown replacement policy: {}".format(replacement))
+        self.size = size
+        self.replacement = replacement
+        nbytes = self._HEADER.size + size * self._ENTRY.size
+        self._owner = name is None
+        if self._owner:
+            self._shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self._buf = self._shm.buf
+        self._release = weakref.finalize(self, _release_shared_memory, self._shm, self._owner)
+
+    def __getstate__(self):
+        return self.size, self.replacement, self._shm.name
+
+    def __setstate__(self, state):
+        size, replacement, name = state
+        self.__init__(size, replacement, name)
+
+    def __len__(self):
+        return sum(self._read(slot) is not None for slot in range(self.size))
+
+    @property
+    def name(self):
+        """The name of the shared memory block."""
+        return self._shm.name
+
+    @property
+    def generation(self):
+        return self._HEADER.unpack_from(self._buf, 0)[0]
+
+    def _read(self, slot):
+        # One unpack reads the three words together; the check is computed
+        # from the same copy, so a torn entry can never pass it
+        check, value, meta = self._ENTRY.unpack_from(self._buf,
+                                                     self._HEADER.size + slot * self._ENTRY.size)
+        if not meta & self._VALID:
+            return None
+        move = meta >> 16 & 0xFFFF
+        return (check ^ self._BITS.unpack(self._DOUBLE.pack(value))[0] ^ meta,
+                meta >> 8 & 0xFF, meta >> 1 & 3, value,
+                None if move == self._NO_MOVE else (move >> 8, move & 0xFF), meta >> 32)
+
+    def probe(self, key):
+        """Return the entry stored for `key`, or None."""
+        entry = self._read(key % self.size)
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key, depth, bound, value, move):
+        """Store a search result, subject to the replacement policy."""
+        slot = key % self.size
+        generation = self.generation
+        if self.replacement == "depth":
+            old = self._read(slot)
+            if (old is not None and old[0] != key and
+                    old[5] == generation & 0xFFFFFFFF and old[1] > depth):
+                return
+        packed_move = self._NO_MOVE if move is None else move[0] << 8 | move[1]
+        meta = (self._VALID | bound << 1 | min(depth, 0xFF) << 8 | packed_move << 16 |
+                (generation & 0xFFFFFFFF) << 32)
+        value_bits = self._BITS.unpack(self._DOUBLE.pack(value))[0]
+        self._ENTRY.pack_into(self._buf, self._HEADER.size + slot * self._ENTRY.size,
+                              key ^ value_bits ^ meta, value, meta)
+
+    def new_search(self):
+        """Start a new search generation for every process using the table."""
+        self._HEADER.pack_into(self._buf, 0, self.generation + 1)
+
+    def clear(self):
+        """Remove every entry."""
+        start = self._HEADER.size
+        self._buf[start:] = bytes(len(self._buf) - start)
+
+    def close(self):
+        """Detach from the shared memory block, removing it if this table
+        created it.
+        """
+        if self._shm is None:
+            return
+        self._buf = None
+        self._shm = None
+        self._release()
+
+
+def _release_shared_memory(shm, unlink):
+    shm.close()
+    if unlink:
+        shm.unlink()
+
+
+class _Helper(AlphaBetaPlayer):
+    """The player of a Lazy SMP worker: it searches with the shared table,
+    leaves the table management to the main process, and rotates the root
+    moves by its index so that the workers start on different moves.
+    """
+    def __init__(self, index, table, **kwargs):
+        super().__init__(tt_size=0, **kwargs)
+        self.index = index
+        self.tt = table
+
+    def start_search(self, game):
+        self._root_move = None
+        self._root_value = None
+        if self.move_ordering is not None:
+            self.move_ordering.new_search()
+
+    def legal_moves(self, game, hash_move=None, ply=0):
+        moves = super().legal_moves(game, hash_move, ply)
+        if ply == 0 and len(moves) > 1:
+            k = self.index % len(moves)
+            moves = moves[k:] + moves[:k]
+        return moves
+
+
+class _TaskTable(object):
+    """The shared table as seen by one worker task: the task is not waited
+    for when it is stopped, so its stores are dropped once the shared
+    generation counter has moved on (e.g., after the table was cleared for
+    a new game).
+    """
+    __slots__ = ("table", "generation", "expected")
+
+    def __init__(self, table, generation, expected):
+        self.table = table
+        self.generation = generation
+        self.expected = expected
+
+    def probe(self, key):
+        return self.table.probe(key)
+
+    def store(self, key, depth, bound, value, move):
+        if self.generation.value == self.expected:
+            self.table.store(key, depth, bound, value, move)
+
+
+class _HelperState(object):
+    """The player and shared values of one Lazy SMP worker process."""
+
+    def __init__(self, player_kwargs, table, generation, counter):
+        with counter.get_lock():
+            counter.value += 1
+            index = counter.value
+        self.player = _Helper(index, table, **player_kwargs)
+        self.table = table
+        self.generation = generation
+
+    def search(self, record, expires_ns, generation, to_move=True):
+        """Run iterative deepening from the root until stopped; see
+        `LazySMPPlayer.start_search`. If `to_move` is False, the opponent is
+        to move at the root (see `LazySMPPlayer.start_pondering`). Returns
+        the deepest completed depth.
+        """
+        player = self.player
+        game = board_for(record, player, to_move)
+        if not game.has_legal_moves():
+            return 0
+        player.tt = _TaskTable(self.table, self.generation, generation)
+        player.start_search(game)
+        player.time_left = _worker_clock(self.generation, generation, expires_ns)
+
+        # Half of the workers skip the odd depths; no search can go deeper
+        # than the number of empty cells
+        depth = 1 + player.index % 2
+        blanks = game.width * game.height - game.move_count
+        try:
+            while depth <= blanks:
+                if to_move:
+                    # The normal root search (with aspiration windows if
+                    # configured); (-1, -1) once it times out
+                    if player.alphabeta(game, depth) == (-1, -1):
+                        break
+                else:
+                    player._clock = search_clock(player)
+                    player.minimize(game, depth, 0, float("-inf"), float("inf"))
+                depth += 1
+        except SearchTimeout:
+            pass
+        return depth - 1
+
+
+def _init_helper(player_kwargs, table, generation, counter):
+    global _worker
+    _worker = _HelperState(player_kwargs, table, generation, counter)
+
+
+def _lazy_search(record, expires_ns, generation, to_move=True):
+    return _worker.search(record, expires_ns, generation, to_move)
+
+
+class LazySMPPlayer(AlphaBetaPlayer):
+    """Game-playing agent that chooses a move using iterative deepening
+    alpha-beta search, helped by a pool of worker processes that search the
+    same root (Lazy SMP).
+
+    The workers start on different root moves and half of them skip the odd
+    depths; they communicate with this process only through a
+    `SharedTranspositionTable`, so their results show up as table hits and
+    better move ordering in the search that picks the move. The workers
+    stop when get_move() returns.
+
+    With pondering enabled, the workers go on searching while the opponent
+    thinks, filling the shared table for the next call to get_move(),
+    which stops them before it starts its own search. Neither step waits
+    for the workers, and the time get_move() spends starting them is
+    reserved from its search budget.
+
+    The worker pool and the shared table are created by the first call to
+    get_move() and released by close(), or on leaving a ``with`` block.
+
+    Parameters
+    ----------
+    search_depth, score_fn, timeout, symmetry, tt_size, tt_replacement, pvs
+        See `AlphaBetaPlayer`; `tt_size` is the size of the shared table.
+
+    workers : int (optional)
+        The number of worker processes; defaults to the number of CPUs
+        minus one.
+
+    ponder : str (optional)
+        None to disable pondering; "predicted" to search the position after
+        the opponent reply predicted by the transposition table; "all" to
+        search every opponent reply.
+
+    **kwargs
+        Any other option of `AlphaBetaPlayer` (move_ordering, aspiration,
+        endgame, book, time_manager), also passed to the workers.
+
+    Attributes
+    ----------
+    ponder_hits : int
+        The number of moves for which the opponent played the reply
+        predicted by "predicted" pondering.
+    """
+    PONDER_MODES = (None, "predicted", "all")
+
+    # Bounds on how long the workers ponder if get_move() is not called
+    # again (e.g., the game is over): a multiple of the time limit of the
+    # last turn, and an absolute limit in milliseconds
+    PONDER_TURNS = 2.
+    PONDER_LIMIT = 60000.
+
+    # Minimum time (in milliseconds) reserved for starting to ponder
+    PONDER_RESERVE = 1.
+
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.,
+                 symmetry=False, tt_size=1 << 16, tt_replacement="depth",
+                 pvs=False, workers=None, ponder=None, **kwargs):
+        if ponder not in self.PONDER_MODES:
+            raise ValueError("Unknown ponder mode: {}".format(ponder))
+        super().__init__(search_depth=search_depth, score_fn=score_fn, timeout=timeout,
+                         symmetry=symmetry, tt_size=0, pvs=pvs, **kwargs)
+        self.tt = None
+        self._tt_size = tt_size
+        self._tt_replacement = tt_replacement
+        self.workers = workers or max(1, multiprocessing.cpu_count() - 1)
+        self._player_kwargs = dict(search_depth=search_depth, score_fn=score_fn,
+                                   timeout=timeout, symmetry=symmetry, pvs=pvs, **kwargs)
+        self._pool = None
+        self._generation = None
+        self.ponder = ponder
+        self._ponder_reserve = self.PONDER_RESERVE
+        self._time_limit = self.PONDER_LIMIT
+        self.ponder_hits = 0
+        self._predicted = None
+
+    def start_pool(self):
+        """Create the shared table and start the worker pool if they do not
+        exist yet.
+        """
+        if self.tt is None:
+            self.tt = SharedTranspositionTable(self._tt_size, self._tt_replacement)
+        if self._pool is None:
+            self._generation = multiprocessing.Value("q", 0)
+            counter = multiprocessing.Value("i", 0)
+            self._pool = multiprocessing.Pool(self.workers, _init_helper,
+                                              (self._player_kwargs, self.tt,
+                                               self._generation, counter))
+
+    def close(self):
+        """Stop the worker pool and release the shared table."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        if self.tt is not None:
+            self.tt.close()
+            self.tt = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def stop_workers(self):
+        """Make the workers stop searching at their next clock check."""
+        if self._generation is not None:
+            with self._generation.get_lock():
+                self._generation.value += 1
+
+    def get_move(self, game, time_left):
+        """Search for the best move with Lazy SMP; see
+        `AlphaBetaPlayer.get_move`.
+        """
+        self.start_pool()
+        self._time_limit = getattr(time_left, "time_limit", None)
+        if self._time_limit is None:
+            self._time_limit = time_left()
+        if self.ponder is None:
+            try:
+                return super().get_move(game, time_left)
+            finally:
+                self.stop_workers()
+
+        # The search stops early enough to leave time for starting to
+        # ponder; the reserve follows the slowest recent start
+        try:
+            move = super().get_move(game, _reserve(time_left, self._ponder_reserve))
+        finally:
+            start = time.perf_counter()
+            self.stop_workers()
+        if move != (-1, -1):
+            self.start_pondering(game, move)
+        cost = (time.perf_counter() - start) * 1000.
+        self._ponder_reserve = max(2. * cost, self._ponder_reserve / 2., self.PONDER_RESERVE)
+        return move
+
+    def start_search(self, game):
+        """Prepare the shared table (see `AlphaBetaPlayer.start_search`) and
+        start the workers on the root position.
+        """
+        # Workers of the previous search (or pondering) stop at their next
+        # clock check and drop their stores from then on, so they are not
+        # waited for even if the table is cleared for a new game
+        self.stop_workers()
+        if self._predicted is not None and self._predicted == game.zobrist_key:
+            self.ponder_hits += 1
+        self._predicted = None
+
+        super().start_search(game)
+        if self._pool is None or not game.has_legal_moves():
+            return
+        generation = self._generation.value
+        record = game.to_bytes()
+        expires_ns = _expires_ns(self.time_left)
+        for _ in range(self.workers):
+            self._pool.apply_async(_lazy_search, (record, expires_ns, generation))
+
+    def start_pondering(self, game, move):
+        """Start the workers on the opponent's turn after this player plays
+        `move` from `game`; they run until the next start_search(), for at
+        most PONDER_TURNS times the time limit of the last turn.
+
+        Returns
+        -------
+        bool
+            False if there is nothing to ponder: the opponent has no legal
+            replies, no reply is predicted, or this player has no legal
+            moves after the predicted reply.
+        """
+        game = game.copy()
+        game.apply_move(move)
+        if not game.has_legal_moves():
+            return False
+        to_move = False
+        if self.ponder == "predicted":
+            entry = self.tt.probe(game.zobrist_key)
+            if entry is None or entry[4] is None:
+                return False
+            game.apply_move(entry[4])
+            if not game.has_legal_moves():
+                return False
+            self._predicted = game.zobrist_key
+            to_move = True
+
+        generation = self._generation.value
+        record = game.to_bytes()
+        limit = min(self.PONDER_TURNS * self._time_limit, self.PONDER_LIMIT)
+        expires_ns = time.perf_counter_ns() + int(limit * 1000000)
+        for _ in range(self.workers):
+            self._pool.apply_async(_lazy_search, (record, expires_ns, generation, to_move))
+        return True
+
+
+def benchmark(depth=6, positions=20, workers=None, score_fn=custom_score, seed=0,
+              player_class=ParallelAlphaBetaPlayer):
+    """Measure the speedup of a multi-process player (`ParallelAlphaBetaPlayer`
+    or `LazySMPPlayer`) over `AlphaBetaPlayer` for fixed-depth searches of
+    random positions.
+
+    Parameters
+    ----------
+    depth : int (optional)
+        The search depth of every search.
+
+    positions : int (optional)
+        The number of positions to search; each one is reached by playing
+        between 2 and 10 random moves from the empty 7x7 board.
+
+    workers, score_fn
+        See `ParallelAlphaBetaPlayer`.
+
+    seed : int (optional)
+        The seed of the random positions.
+
+    player_class : class (optional)
+        The multi-process player to compare.
+
+    Returns
+    -------
+    (float, float, float)
+        The serial time and parallel time in seconds, and the speedup.
+    """
+    import random
+    rng = random.Random(seed)
+    records = []
+    for _ in range(positions):
+        game = Board("player 1", "player 2", shuffle=False)
+        for _ in range(rng.randint(2, 10)):
+            moves = game.get_legal_moves()
+            if not moves:
+                break
+            game.apply_move(rng.choice(moves))
+        if game.get_legal_moves():
+            records.append(game.to_bytes())
+
+    serial = AlphaBetaPlayer(score_fn=score_fn)
+    parallel = player_class(score_fn=score_fn, workers=workers)
+    parallel.start_pool()
+    times = []
+    try:
+        for player in (serial, parallel):
+            start = time.perf_counter()
+            for record in records:
+                game = board_for(record, player)
+                player.time_left = Deadline(3600 * 1000)
+                player.start_search(game)
+                for d in range(1, depth + 1):
+                    player._clock = search_clock(player)
+                    player.search_root(game, d)
+                if player is parallel:
+                    parallel.stop_workers()
+            times.append(time.perf_counter() - start)
+    finally:
+        parallel.close()
+    return times[0], times[1], times[0] / times[1]
+
+
+def benchmark_table(size=1 << 16, operations=100000, seed=0):
+    """Measure the cost of store() and probe() on a `TranspositionTable` and
+    on a `SharedTranspositionTable` of the same size.
+
+    Returns
+    -------
+    dict
+        Nanoseconds per operation, keyed by (table class name, operation).
+    """
+    import random
+    rng = random.Random(seed)
+    keys = [rng.getrandbits(64) for _ in range(operations)]
+    results = {}
+    shared = SharedTranspositionTable(size)
+    try:
+        for table in (TranspositionTable(size), shared):
+            name = type(table).__name__
+            start = time.perf_counter_ns()
+            for i, key in enumerate(keys):
+                table.store(key, i & 7, i % 3, 0.5 * i, (i & 7, i >> 3 & 7))
+            results[name, "store"] = (time.perf_counter_ns() - start) / operations
+            start = time.perf_counter_ns()
+            for key in keys:
+                table.probe(key)
+            results[name, "probe"] = (time.perf_counter_ns() - start) / operations
+    finally:
+        shared.close()
+    return results
+
+
+if __name__ == "__main__":
+    for player_class in (ParallelAlphaBetaPlayer, LazySMPPlayer):
+        serial_time, parallel_time, speedup = benchmark(player_class=player_class)
+        print("{}: serial {:.2f}s, parallel {:.2f}s, speedup {:.2f}x".format(
+            player_class.__name__, serial_time, parallel_time, speedup))
+    for (name, operation), ns in sorted(benchmark_table().items()):
+        print("{} {}: {:.0f} ns".format(name, operation, ns))
@@ -20,8 +20,8 @@ from collections import namedtuple
 from isolation import Board
 from sample_players import (RandomPlayer, open_move_score,
                             improved_score, center_score)
-from game_agent import (MinimaxPlayer, AlphaBetaPlayer, custom_score,
-                        custom_score_2, custom_score_3, custom_score_generator, custom_score_generator_with_center)
+from game_agent import (MinimaxPlayer, AlphaBetaPlayer, SearchStats, custom_score,
+                        custom_score_2, custom_score_3)
 
 NUM_MATCHES = 20  # number of matches against each opponent
 TIME_LIMIT = 150  # number of milliseconds before timeout
@@ -62,6 +62,7 @@ def play_round(cpu_agent, test_agents, win_counts, num_matches):
         for game in games:
             winner, _, termination = game.play(time_limit=TIME_LIMIT)
             win_counts[winner] += 1
+            close_players(game.active_player, game.inactive_player)
 
             if termination == "timeout":
                 timeout_count += 1
@@ -71,6 +72,17 @@ def play_round(cpu_agent, test_agents, win_counts, num_matches):
     return timeout_count, forfeit_count
 
 
+def close_players(*players):
+    """Stop the worker processes of multi-process players (see
+    parallel_search.py) so that they do not keep pondering into the next
+    game; the players start new workers when they are asked for a move.
+    """
+    for player in players:
+        close = getattr(player, "close", None)
+        if close is not None:
+            close()
+
+
 def update(total_wins, wins):
     for player in total_wins:
         total_wins[player] += wins[player]
@@ -114,6 +126,8 @@ def play_matches(cpu_agents, test_agents, num_matches):
             ) for x in enumerate(test_agents)
     ]))
 
+    print_search_stats(test_agents)
+
     if total_timeouts:
         print(("\nThere were {} timeouts during the tournament -- make sure " +
                "your agent handles search timeout correctly, and consider " +
@@ -124,6 +138,31 @@ def play_matches(cpu_agents, test_agents, num_matches):
                "legal moves available to play.\n").format(total_forfeits))
 
 
+def search_stats(agents):
+    """Return the `SearchStats` of every get_move() call made by the given
+    agents, added up; agents whose players keep no statistics are skipped.
+    """
+    total = SearchStats()
+    for agent in agents:
+        stats = getattr(agent.player, "stats", None)
+        if stats is not None:
+            total.merge(stats)
+    return total
+
+
+def print_search_stats(agents):
+    """Print the search statistics accumulated by each agent over the
+    tournament.
+    """
+    print("\n{:^30}{:>12}{:>10}{:>8}{:>9}{:>10}".format(
+        "Agent", "Nodes", "NPS", "Depth", "TT hit", "1st cut"))
+    for agent in agents:
+        stats = search_stats([agent])
+        print("{:^30}{:>12}{:>10.0f}{:>8.2f}{:>9.1%}{:>10.1%}".format(
+            agent.name, stats.nodes, stats.nps, stats.mean_depth, stats.tt_hit_rate,
+            stats.first_move_cutoffs))
+
+
 def main():
 
     # Define two agents to compare -- these agents will play from the same